@@ -0,0 +1,97 @@
+"""Boss behaviour dispatch cost with many boss instances.
+
+Run with: python bench_boss.py [bosses] [frames]
+Compares the compiled phase tables (Boss.update / get_attack_settings)
+against the string-compare if/elif chain they replaced, driving the same
+movement programs, so the difference is dispatch alone. Headless: no
+window is opened.
+"""
+import sys
+import time
+from settings import *
+from boss import Boss
+from sim_clock import SimClock
+
+BOSS_TYPES = ('slime', 'bee', 'ladybug')
+PHASES = ('intro', 'phase1', 'phase2')
+REPEATS = 5
+
+def string_dispatch(boss):
+    # The pre-table Boss.update body: phase, then boss_type, compared every frame
+    if boss.phase == 'intro':
+        if boss.boss_type == 'bee':
+            boss.move_hop(5, SCREEN_HEIGHT // 2, 10)
+        else:
+            boss.move_hop(5)
+    elif boss.phase == 'phase1':
+        if boss.boss_type == 'bee':
+            boss.move_figure_eight((SCREEN_WIDTH // 2, SCREEN_HEIGHT // 3), (300, 100), 0.002)
+        elif boss.boss_type == 'ladybug':
+            boss.move_patrol(7, 50)
+        else:
+            boss.move_hold_ground()
+    elif boss.phase == 'phase2':
+        if boss.boss_type == 'ladybug':
+            boss.move_rise_strafe(8)
+        elif boss.boss_type == 'bee':
+            boss.move_strafe_wave(12, 150, 50, 0.01)
+        else:
+            boss.move_rise_strafe(10)
+
+def string_attacks(boss):
+    # The pre-table get_attack_settings: a fresh list per volley
+    settings = []
+    if boss.boss_type == 'ladybug':
+        if boss.phase == 'phase2':
+            settings.append(('brick', 1.5, 10, 90))
+        else:
+            settings.append(('brick', 1.5, 6, 0))
+    elif boss.boss_type == 'bee':
+        if boss.phase == 'phase2':
+            settings.append(('brick', 0.4, 8, -10))
+            settings.append(('brick', 0.4, 8, 0))
+            settings.append(('brick', 0.4, 8, 10))
+        else:
+            settings.append(('brick', 0.4, 10, 0))
+    else:
+        settings.append(('brick', 0.5, 8, 0))
+    return settings
+
+def build_bosses(count):
+    clock = SimClock(seed=0)
+    bosses = []
+    for i in range(count):
+        boss = Boss(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2, BOSS_TYPES[i % 3], clock)
+        phase = PHASES[(i // 3) % 3]
+        if phase != 'intro':
+            boss.transition_to_phase(phase)
+        bosses.append(boss)
+    return clock, bosses
+
+def time_loop(clock, bosses, frames, step):
+    start = time.perf_counter()
+    for _ in range(frames):
+        clock.advance_frame()
+        for boss in bosses:
+            step(boss)
+    return (time.perf_counter() - start) / (frames * len(bosses)) * 1e9
+
+def run(count=1000, frames=200):
+    rows = [
+        ('update (table)', lambda boss: boss.move()),
+        ('update (strings)', string_dispatch),
+        ('attacks (table)', lambda boss: boss.get_attack_settings()),
+        ('attacks (strings)', string_attacks),
+    ]
+    print(f"{count} bosses x {frames} frames")
+    print(f"{'dispatch':<18} {'ns/boss/frame':>14}")
+    for name, step in rows:
+        # Fresh bosses per run, so every row replays the same movement;
+        # best of REPEATS to keep scheduler noise out
+        best = min(time_loop(*build_bosses(count), frames, step) for _ in range(REPEATS))
+        print(f"{name:<18} {best:>14.0f}")
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    frames = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    run(count, frames)
@@ -0,0 +1,58 @@
+"""Cost per collision pair for the rect, mask and hybrid collision modes.
+
+Run with: python bench_collision.py [pairs]
+Uses the dummy SDL video driver, so no window is opened.
+"""
+import os
+import sys
+import time
+import random
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+from settings import *
+from sprite_loader import SpriteLoader
+from collision import COLLISION_MODES, collide, mask_cache
+
+def build_pairs(count, seed=1):
+    rng = random.Random(seed)
+    boss_images = list(SpriteLoader.get_boss_banks('slime')['phase1'].variants.values())
+    bullet_images = [SpriteLoader.get_rotated_projectile(kind, scale, rng.uniform(0, 360))
+                     for kind, scale in (('fireball', 0.7), ('fireball', 1.2), ('brick', 0.5))
+                     for _ in range(8)]
+    pairs = []
+    for _ in range(count):
+        boss_image = rng.choice(boss_images)
+        bullet_image = rng.choice(bullet_images)
+        boss_rect = boss_image.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
+        # Scatter bullets around the boss so pairs mix misses, corner hits and solid hits
+        bullet_rect = bullet_image.get_rect(center=(
+            boss_rect.centerx + rng.uniform(-1, 1) * boss_rect.width * 0.7,
+            boss_rect.centery + rng.uniform(-1, 1) * boss_rect.height * 0.7,
+        ))
+        pairs.append((boss_rect, boss_image, bullet_rect, bullet_image))
+    return pairs
+
+def run(count=20000):
+    pygame.init()
+    pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pairs = build_pairs(count)
+
+    # Warm the mask cache so the timings show steady-state cost
+    for boss_rect, boss_image, bullet_rect, bullet_image in pairs:
+        mask_cache.get(boss_image)
+        mask_cache.get(bullet_image)
+
+    print(f"{'mode':<8} {'ns/pair':>10} {'hits':>8}")
+    for mode in COLLISION_MODES:
+        start = time.perf_counter()
+        hits = 0
+        for boss_rect, boss_image, bullet_rect, bullet_image in pairs:
+            if collide(boss_rect, boss_image, bullet_rect, bullet_image, mode):
+                hits += 1
+        elapsed = time.perf_counter() - start
+        print(f"{mode:<8} {elapsed / count * 1e9:>10.0f} {hits:>8}")
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,296 @@
+"""Frame-time benchmarks on reproducible stress scenes built from the real game classes.
+
+    python benchmark.py --frames 300 --out results.json
+    python benchmark.py --baseline results.json        # exit 1 on regressions
+
+Scenes render to the dummy SDL video driver (no window); --headless skips
+drawing so battle scenes measure only the simulation. Each scene reports
+frame-time p50/p95/p99, the growth in allocated Python memory blocks per
+frame (sys.getallocatedblocks), the tracemalloc peak and the process peak
+RSS (where the resource module exists, i.e. not on Windows).
+"""
+import os
+import sys
+import gc
+import json
+import time
+import random
+import argparse
+import tracemalloc
+try:
+    import resource
+except ImportError: # Windows
+    resource = None
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+from settings import *
+from controls import ScriptedControls
+from main import Battle, new_player_data
+
+BOSS_TYPES = ('slime', 'bee', 'ladybug')
+PHASES = ('intro', 'phase1', 'phase2')
+
+def battle_frame(battle, headless):
+    def frame():
+        battle.step()
+        if not headless:
+            battle.draw()
+    return frame
+
+def make_battle(screen, boss_type, phase='intro'):
+    battle = Battle(None if screen is None else screen, boss_type, ScriptedControls(), seed=0)
+    battle.load_player_data(new_player_data())
+    # Keep the fight going for the whole run
+    battle.player.hp = battle.player.max_hp = 10 ** 6
+    if phase != 'intro':
+        battle.boss.transition_to_phase('phase1')
+        if phase == 'phase2':
+            battle.boss.transition_to_phase('phase2')
+    return battle
+
+def scene_bullet_storm(screen, headless, count=2000):
+    battle = make_battle(screen, 'slime', 'phase1')
+    battle.controls.set_frame(held={pygame.K_x})
+    rng = random.Random(0)
+    bullets = battle.bullets
+    cx, cy = SCREEN_WIDTH // 2, SCREEN_HEIGHT // 3
+    step = battle_frame(battle, headless)
+
+    def frame():
+        # Top the storm back up to `count` boss bullets every frame
+        for _ in range(count - bullets.count()):
+            bullets.spawn_boss_bullet(cx, cy, rng.uniform(0, SCREEN_WIDTH), rng.uniform(0, SCREEN_HEIGHT),
+                                      scale=0.5, speed=rng.uniform(1, 4))
+        step()
+    return frame
+
+# Bullet curtains fired by the pattern emitter, a volley every CURTAIN_COOLDOWN frames
+CURTAINS = {
+    'ring': {'pattern': 'ring', 'count': 120, 'speed': 4},
+    'spiral': {'pattern': 'spiral', 'count': 160, 'step': 7, 'speed': 4},
+    'wave': {'pattern': 'wave', 'count': 120, 'step': 2, 'amplitude': 30, 'rate': 0.3, 'speed': 5},
+}
+CURTAIN_COOLDOWN = 20
+
+def scene_curtain(screen, headless, pattern):
+    from patterns import compile_attacks
+    battle = make_battle(screen, 'slime', 'phase1')
+    battle.boss.attacks = compile_attacks([dict(CURTAINS[pattern], scale=0.4)])
+    battle.boss.shoot_cooldown = CURTAIN_COOLDOWN
+    return battle_frame(battle, headless)
+
+def scene_swarm(screen, headless, count):
+    # Slime King plus `count` minions, flies in bands across the sky and mice on the ground
+    battle = make_battle(screen, 'slime', 'phase1')
+    for i in range(count):
+        x = 40 + (i * 37) % (SCREEN_WIDTH - 80)
+        if i % 2:
+            y = 80 + (i * 53) % 400
+            battle.spawn('minion', 'fly', (x, y), {'y': y})
+        else:
+            battle.spawn('minion', 'mouse', (x, SCREEN_HEIGHT - 80))
+    battle.controls.set_frame(held={pygame.K_x})
+    return battle_frame(battle, headless)
+
+def scene_particles(screen, headless):
+    # A death burst every frame keeps the particle budget full (and recycling)
+    battle = make_battle(screen, 'slime', 'phase1')
+    battle.controls.set_frame(held={pygame.K_x})
+    step = battle_frame(battle, headless)
+
+    def frame():
+        battle.particles.emit('burst', *battle.boss.rect.center, 80)
+        step()
+    return frame
+
+def scene_boss(screen, headless, boss_type, phase):
+    battle = make_battle(screen, boss_type, phase)
+    battle.controls.set_frame(held={pygame.K_x})
+    return battle_frame(battle, headless)
+
+def scene_overworld(screen, headless):
+    from overworld import Island1
+    from prefetch import prefetcher
+    island = Island1(screen, [], True, False)
+    controls = ScriptedControls()
+    island.player.controls = controls
+    # Walk a loop around the open grass in the middle of the map
+    route = [pygame.K_RIGHT, pygame.K_DOWN, pygame.K_LEFT, pygame.K_UP]
+    frames = [0]
+
+    def frame():
+        controls.set_frame(held={route[(frames[0] // 60) % len(route)]})
+        frames[0] += 1
+        island.run([])
+        prefetcher.pump()
+        pygame.display.flip()
+    return frame
+
+def scene_transition(screen, headless):
+    from overworld import Island1
+    player_data = new_player_data()
+    island = Island1(screen, player_data['defeated_bosses'])
+    island.draw()
+    frames = [0]
+
+    def frame():
+        # Battle -> map: every other return flips a flag (the rest change nothing)
+        frames[0] += 1
+        if frames[0] % 2:
+            if 'slime' in player_data['defeated_bosses']:
+                player_data['defeated_bosses'].remove('slime')
+            else:
+                player_data['defeated_bosses'].append('slime')
+        island.apply_progress(player_data)
+        island.draw()
+    return frame
+
+def scene_shop(screen, headless):
+    from shop import Shop
+    shop = Shop(screen)
+    frames = [0]
+
+    def frame():
+        # Move the selection now and then so text and highlight change
+        frames[0] += 1
+        if frames[0] % 30 == 0:
+            shop.selected_index = (shop.selected_index + 1) % len(shop.items)
+        shop.draw()
+    return frame
+
+def scene_menu(screen, headless):
+    from menu import Menu
+    player_data = new_player_data()
+    player_data['powers'] = ['hp', 'speed', 'wide', 'dash']
+    player_data['equipped_powers'] = ['speed']
+    menu = Menu(screen, player_data)
+    frames = [0]
+
+    def frame():
+        frames[0] += 1
+        if frames[0] % 30 == 0:
+            menu.selected_index = (menu.selected_index + 1) % len(menu.owned_power_ids)
+        menu.draw()
+    return frame
+
+def all_scenes():
+    scenes = {'bullet_storm_2000': lambda screen, headless: scene_bullet_storm(screen, headless, 2000)}
+    for pattern in CURTAINS:
+        scenes[f"curtain_{pattern}"] = lambda screen, headless, p=pattern: scene_curtain(screen, headless, p)
+    for count in (50, 500):
+        scenes[f"swarm_{count}"] = lambda screen, headless, n=count: scene_swarm(screen, headless, n)
+    for boss_type in BOSS_TYPES:
+        for phase in PHASES:
+            scenes[f"boss_{boss_type}_{phase}"] = (
+                lambda screen, headless, b=boss_type, p=phase: scene_boss(screen, headless, b, p))
+    scenes['particles_budget'] = scene_particles
+    scenes['overworld_island1'] = scene_overworld
+    scenes['overworld_transition'] = scene_transition
+    scenes['shop'] = scene_shop
+    scenes['menu'] = scene_menu
+    return scenes
+
+# Scenes that only draw; skipped with --headless
+DRAW_ONLY = {'particles_budget', 'overworld_island1', 'overworld_transition', 'shop', 'menu'}
+
+def peak_rss_kb():
+    # ru_maxrss is in kilobytes on Linux but bytes on macOS
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 if sys.platform == 'darwin' else rss
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def measure(build, screen, headless, frames, warmup):
+    frame = build(screen, headless)
+    for _ in range(warmup):
+        frame()
+
+    gc.collect()
+    blocks_before = sys.getallocatedblocks()
+    times = []
+    for _ in range(frames):
+        start = time.perf_counter_ns()
+        frame()
+        times.append(time.perf_counter_ns() - start)
+    blocks_after = sys.getallocatedblocks()
+
+    # Separate, shorter pass under tracemalloc (it slows every allocation)
+    tracemalloc.start()
+    for _ in range(max(1, frames // 10)):
+        frame()
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    times.sort()
+    return {
+        'frames': frames,
+        'mean_ms': sum(times) / len(times) / 1e6,
+        'p50_ms': percentile(times, 0.50) / 1e6,
+        'p95_ms': percentile(times, 0.95) / 1e6,
+        'p99_ms': percentile(times, 0.99) / 1e6,
+        'max_ms': times[-1] / 1e6,
+        'net_blocks_per_frame': (blocks_after - blocks_before) / frames,
+        'traced_peak_kb': traced_peak / 1024,
+        'peak_rss_kb': peak_rss_kb(),
+    }
+
+def compare(results, baseline, tolerance):
+    """Scenes whose p95 got slower than the baseline by more than tolerance."""
+    regressions = []
+    for name, result in results['scenes'].items():
+        base = baseline.get('scenes', {}).get(name)
+        if base and result['p95_ms'] > base['p95_ms'] * (1 + tolerance):
+            regressions.append((name, base['p95_ms'], result['p95_ms']))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--warmup', type=int, default=30)
+    parser.add_argument('--scenes', nargs='*', default=None, help='scene names or prefixes (default: all)')
+    parser.add_argument('--headless', action='store_true', help='simulate only, never draw')
+    parser.add_argument('--out', default=None, help='write results as JSON')
+    parser.add_argument('--baseline', default=None, help='compare against an earlier --out file')
+    parser.add_argument('--tolerance', type=float, default=0.10, help='allowed p95 slowdown vs baseline')
+    args = parser.parse_args(argv)
+
+    pygame.init()
+    screen = None if args.headless else pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+
+    results = {'frames': args.frames, 'headless': args.headless, 'scenes': {}}
+    print(f"{'scene':<22} {'p50':>7} {'p95':>7} {'p99':>7} {'blk/f':>7} {'rss MB':>7}")
+    for name, build in all_scenes().items():
+        if args.scenes and not any(name.startswith(prefix) for prefix in args.scenes):
+            continue
+        if args.headless and name in DRAW_ONLY:
+            continue
+        result = measure(build, screen, args.headless, args.frames, args.warmup)
+        results['scenes'][name] = result
+        rss = result['peak_rss_kb']
+        print(f"{name:<22} {result['p50_ms']:>7.2f} {result['p95_ms']:>7.2f} {result['p99_ms']:>7.2f} "
+              f"{result['net_blocks_per_frame']:>7.1f} {'-' if rss is None else f'{rss / 1024:.1f}':>7}")
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for name, before, after in regressions:
+            print(f"REGRESSION {name}: p95 {before:.2f} ms -> {after:.2f} ms")
+        if regressions:
+            return 1
+        print("No regressions against baseline")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,33 +1,82 @@
 import pygame
-import random
 import math
+import inspect
+from functools import partial
 from settings import *
 from sprite_loader import SpriteLoader
+from sim_clock import SimClock
+from boss_defs import get_definition, get_minion_definition
+from patterns import compile_attacks
+
+PHASES = ('intro', 'phase1', 'phase2')
+# Phase reached when the current one runs out of health (phase2 is the last)
+NEXT_PHASE = {'intro': 'phase1', 'phase1': 'phase2'}
+MINION_DEATH_FRAMES = 30
+
+# boss_type -> phase -> (movement function, positional arguments, attacks, cooldown)
+compiled_bosses = {}
+
+def compile_move(move_name, params):
+    """(Boss.move_<name>, positional arguments) for a movement program and its parameters."""
+    move = getattr(Boss, f"move_{move_name}", None)
+    if move is None:
+        raise ValueError(f"unknown movement program '{move_name}'")
+    try:
+        bound = inspect.signature(move).bind(None, **params)
+    except TypeError as e:
+        raise ValueError(f"bad parameters for '{move_name}': {e}")
+    bound.apply_defaults()
+    return move, tuple(bound.arguments.values())[1:]
+
+def compile_boss(boss_type):
+    """Turn a boss definition into per-phase dispatch entries, once per boss type.
+
+    Movement programs are resolved to Boss methods, their parameters bound
+    to positional arguments (keyword partials cost more per call) and
+    attacks compiled into pattern volleys here, so a bad definition fails at
+    load time and a frame never compares strings.
+    """
+    program = compiled_bosses.get(boss_type)
+    if program is None:
+        program = {}
+        for phase, phase_def in get_definition(boss_type).items():
+            try:
+                move, args = compile_move(*phase_def['move'])
+                attacks = compile_attacks(phase_def['attacks'])
+            except ValueError as e:
+                raise ValueError(f"Boss '{boss_type}' {phase}: {e}")
+            program[phase] = (move, args, attacks, phase_def['cooldown'])
+        compiled_bosses[boss_type] = program
+    return program
 
 class Boss(pygame.sprite.Sprite):
-    def __init__(self, x, y, boss_type='slime'):
+    def __init__(self, x, y, boss_type='slime', clock=None):
         super().__init__()
         self.boss_type = boss_type
+        # All time comes from the battle's simulation clock
+        self.clock = clock if clock is not None else SimClock()
         self.all_sprites = SpriteLoader.get_boss_sprites(boss_type)
-        self.phase = 'intro'
+        self.all_banks = SpriteLoader.get_boss_banks(boss_type)
+
+        # Movement bound to this boss, per phase: update() makes one call
+        program = compile_boss(boss_type)
+        self.phase_table = {
+            phase: (partial(move, self, *args), attacks, cooldown)
+            for phase, (move, args, attacks, cooldown) in program.items()
+        }
+
         self.state = 'idle'
-        self.sprites = self.all_sprites['intro']
-        self.image = self.sprites['idle']
-        self.rect = self.image.get_rect(center=(x, y))
-        
         self.health = 100
         self.max_health = 100
         self.attack_timer = 0
         self.shoot_timer = 0
-        
-        # Base settings based on boss type
-        if self.boss_type == 'bee':
-            self.shoot_cooldown = 45 # Fast shooting
-        elif self.boss_type == 'ladybug':
-            self.shoot_cooldown = 150 # Slow shooting (block shots)
-        else: # slime or default
-            self.shoot_cooldown = 120
-            
+        self.expired = False # Death animation over; the battle drops it
+        self.particles = None # Effects, set by the battle (None when headless)
+        self.enter_phase('intro')
+        self.image = self.sprites['idle']
+        self.rect = self.image.get_rect(center=(x, y))
+        self.prev_pos = self.rect.topleft # Position before the last sim step (for interpolation)
+
         self.frame_index = 0
         self.animation_speed = 0.1
         self.death_timer = 180 # 3 seconds death animation
@@ -39,9 +88,9 @@ class Boss(pygame.sprite.Sprite):
 
     def animate(self):
         if self.state == 'dying':
-            self.image = self.sprites.get('death', self.sprites['idle'])
-            if (pygame.time.get_ticks() // 100) % 2 == 0:
-                self.image = pygame.transform.flip(self.image, True, False)
+            img_key = 'death' if 'death' in self.bank else 'idle'
+            flipped = (self.clock.ticks() // 100) % 2 == 0
+            self.image = self.bank.get(img_key, flipped)
             return
 
         self.frame_index += self.animation_speed
@@ -51,134 +100,200 @@ class Boss(pygame.sprite.Sprite):
 
     def update(self):
         self.animate()
-        
+
         if self.state == 'dying':
             self.death_timer -= 1
             if self.death_timer <= 0:
-                self.kill()
+                self.expired = True
             return
 
-        # Phase logic depends on boss type
-        if self.phase == 'intro':
-            self.move_intro()
-        elif self.phase == 'phase1':
-            self.move_phase1()
-        elif self.phase == 'phase2':
-            self.move_phase2()
-
-    def move_intro(self):
-        # Default intro movement: Horizontal jumping (used by Slime and Ladybug)
-        self.rect.x += self.direction_x * 5
+        self.move()
+
+    # Movement programs, referenced by name from boss_defs
+
+    def move_hop(self, speed, hover_y=None, boost=0):
+        # Horizontal jumping; with hover_y, skim along that height instead
+        self.rect.x += self.direction_x * speed
         if self.rect.left <= 0:
             self.rect.left = 0
             self.direction_x = 1
         elif self.rect.right >= SCREEN_WIDTH:
             self.rect.right = SCREEN_WIDTH
             self.direction_x = -1
-        
+
         # Vertical movement (Jumping)
         self.velocity_y += self.gravity
         self.rect.y += self.velocity_y
-        
+
         if self.rect.bottom >= SCREEN_HEIGHT - 50:
             self.rect.bottom = SCREEN_HEIGHT - 50
             self.velocity_y = self.jump_speed
 
-        if self.boss_type == 'bee':
-            # Bee intro is faster and doesn't jump as much
+        if hover_y is not None:
             self.velocity_y = 0
-            self.rect.centery = SCREEN_HEIGHT // 2
-            self.rect.x += self.direction_x * 10 # Speed boost for bee intro
-
-    def move_phase1(self):
-        if self.boss_type == 'bee':
-            # Figure-eight hovering
-            t = pygame.time.get_ticks() * 0.002
-            self.rect.centerx = SCREEN_WIDTH // 2 + math.cos(t) * 300
-            self.rect.centery = SCREEN_HEIGHT // 3 + math.sin(t * 2) * 100
-        elif self.boss_type == 'ladybug':
-            # Ground patrol: Horizontal walking
-            self.rect.x += self.direction_x * 7
-            self.rect.bottom = SCREEN_HEIGHT - 50
-            if self.rect.left <= 50 or self.rect.right >= SCREEN_WIDTH - 50:
-                self.direction_x *= -1
-        else: # Slime or default
-            # Phase 1 Slime: Stays still (original used sine wave and horizontal movement)
-            # We just ensure it's at a good height
-            self.rect.bottom = SCREEN_HEIGHT - 50
+            self.rect.centery = hover_y
+            self.rect.x += self.direction_x * boost
 
-    def move_phase2(self):
-        if self.boss_type == 'ladybug':
-            # Ceiling hang: Move to top and strafe
-            if self.rect.top > 50:
-                self.rect.y -= 5
-            else:
-                self.rect.x += self.direction_x * 8
-                if self.rect.left <= 0 or self.rect.right >= SCREEN_WIDTH:
-                    self.direction_x *= -1
-        elif self.boss_type == 'bee':
-            # Tight Orbit: Strafe back and forth with vertical sine wave
-            self.rect.x += self.direction_x * 12
-            self.rect.y = 150 + math.sin(pygame.time.get_ticks() * 0.01) * 50
+    def move_figure_eight(self, center, radius, rate):
+        # Figure-eight hovering
+        t = self.clock.ticks() * rate
+        self.rect.centerx = center[0] + math.cos(t) * radius[0]
+        self.rect.centery = center[1] + math.sin(t * 2) * radius[1]
+
+    def move_patrol(self, speed, margin):
+        # Ground patrol: Horizontal walking
+        self.rect.x += self.direction_x * speed
+        self.rect.bottom = SCREEN_HEIGHT - 50
+        if self.rect.left <= margin or self.rect.right >= SCREEN_WIDTH - margin:
+            self.direction_x *= -1
+
+    def move_hold_ground(self):
+        # Stay put at a good height on the ground
+        self.rect.bottom = SCREEN_HEIGHT - 50
+
+    def move_rise_strafe(self, speed):
+        # Rise to the ceiling, then strafe along it
+        if self.rect.top > 50:
+            self.rect.y -= 5
+        else:
+            self.rect.x += self.direction_x * speed
             if self.rect.left <= 0 or self.rect.right >= SCREEN_WIDTH:
                 self.direction_x *= -1
-        else: # Slime or default
-            # Fly at the top (original behavior)
-            if self.rect.top > 50:
-                self.rect.y -= 5
-            else:
-                self.rect.x += self.direction_x * 10
-                if self.rect.left <= 0 or self.rect.right >= SCREEN_WIDTH:
-                    self.direction_x *= -1
+
+    def move_strafe_wave(self, speed, y, amplitude, rate):
+        # Strafe back and forth with a vertical sine wave
+        self.rect.x += self.direction_x * speed
+        self.rect.y = y + math.sin(self.clock.ticks() * rate) * amplitude
+        if self.rect.left <= 0 or self.rect.right >= SCREEN_WIDTH:
+            self.direction_x *= -1
 
     def get_attack_settings(self):
-        """Returns a list of bullet parameters (bullet_type, scale, speed, angle_offset)"""
-        settings = []
-        
-        if self.boss_type == 'ladybug':
-            if self.phase == 'phase2':
-                # Dropping block shots from ceiling
-                settings.append(('brick', 1.5, 10, 90)) # Shoot downwards
-            else:
-                # Standard ground block shot
-                settings.append(('brick', 1.5, 6, 0))
-        elif self.boss_type == 'bee':
-            if self.phase == 'phase2':
-                # Burst of stingers, but slower (was speed 15)
-                settings.append(('brick', 0.4, 8, -10))
-                settings.append(('brick', 0.4, 8, 0))
-                settings.append(('brick', 0.4, 8, 10))
-            else:
-                # Standard stinger, but slower (was speed 15)
-                settings.append(('brick', 0.4, 10, 0))
-        else: # slime
-            # Revert Phase 2 speed to Phase 1 speed (8)
-            settings.append(('brick', 0.5, 8, 0))
-                
-        return settings
+        """Returns the phase's patterns.Volley tuple (shared, do not mutate)"""
+        return self.attacks
+
+    def can_shoot(self):
+        return self.phase != 'intro'
+
+    def defeated(self):
+        # Out of health in the last phase (earlier phases roll over in take_damage)
+        return self.health <= 0 and self.phase not in NEXT_PHASE
+
+    def progress(self):
+        """How far through the fight this boss is, from 0 to 1."""
+        return (PHASES.index(self.phase) + (100 - self.health) / 100.0) / len(PHASES)
+
+    def enter_phase(self, phase):
+        self.phase = phase
+        self.sprites = self.all_sprites[phase]
+        self.bank = self.all_banks[phase]
+        self.move, self.attacks, self.shoot_cooldown = self.phase_table[phase]
 
     def transition_to_phase(self, new_phase):
-        self.phase = new_phase
-        self.sprites = self.all_sprites[new_phase]
+        self.enter_phase(new_phase)
         self.health = 100 # Reset health for new phase
-        if new_phase == 'phase2':
-            if self.boss_type == 'bee':
-                self.shoot_cooldown = 100 # Slower shooting in Phase 2 (was 30)
-            elif self.boss_type == 'ladybug':
-                self.shoot_cooldown = 100
-            else:
-                self.shoot_cooldown = 60 # Faster shooting in phase 2 for slime
-        
+
     def trigger_death(self):
         self.state = 'dying'
+        if self.particles is not None:
+            self.particles.emit('burst', *self.rect.center, 80)
+            self.particles.emit('smoke', *self.rect.center, 30, speed_scale=3)
 
-    def take_damage(self, amount):
+    def take_damage(self, amount, at=None):
+        # at: where the shot landed, for the hit sparks
         if self.state != 'dying':
+            if self.particles is not None:
+                self.particles.emit('spark', *(at or self.rect.center), 6)
             self.health -= amount
             if self.health <= 0:
-                if self.phase == 'intro':
-                    self.transition_to_phase('phase1')
-                elif self.phase == 'phase1':
-                    self.transition_to_phase('phase2')
+                next_phase = NEXT_PHASE.get(self.phase)
+                if next_phase is not None:
+                    self.transition_to_phase(next_phase)
                 else:
                     self.health = 0 # Final death will be caught by main.py
+
+# (minion_type, movement overrides) -> (movement function, arguments, attacks, cooldown, health)
+compiled_minions = {}
+
+def compile_minion(minion_type, overrides=None):
+    key = (minion_type, tuple(sorted((overrides or {}).items())))
+    program = compiled_minions.get(key)
+    if program is None:
+        minion_def = get_minion_definition(minion_type)
+        move_name, params = minion_def['move']
+        try:
+            move, args = compile_move(move_name, {**params, **(overrides or {})})
+            attacks = compile_attacks(minion_def['attacks'])
+        except ValueError as e:
+            raise ValueError(f"Minion '{minion_type}': {e}")
+        program = (move, args, attacks, minion_def['cooldown'], minion_def['health'])
+        compiled_minions[key] = program
+    return program
+
+class Minion:
+    """A small hostile with one phase that dies when its health runs out.
+
+    A __slots__ record rather than a Sprite so swarms of hundreds stay cheap.
+    It runs the Boss movement programs, which only touch the movement
+    attributes below.
+    """
+    __slots__ = ('minion_type', 'clock', 'sprites', 'image', 'rect', 'prev_pos',
+                 'move', 'attacks', 'shoot_timer', 'shoot_cooldown', 'health', 'max_health',
+                 'state', 'expired', 'particles', 'frame_index', 'animation_speed', 'death_timer',
+                 'direction_x', 'velocity_y', 'jump_speed', 'gravity')
+
+    def __init__(self, x, y, minion_type, clock, overrides=None):
+        self.minion_type = minion_type
+        self.clock = clock
+        self.sprites = SpriteLoader.get_minion_sprites(minion_type)
+        move, args, self.attacks, self.shoot_cooldown, self.health = compile_minion(minion_type, overrides)
+        self.move = partial(move, self, *args)
+        self.max_health = self.health
+        self.shoot_timer = 0
+        self.state = 'idle'
+        self.expired = False
+        self.particles = None
+        self.image = self.sprites['idle']
+        self.rect = self.image.get_rect(center=(x, y))
+        self.prev_pos = self.rect.topleft
+
+        self.frame_index = 0
+        self.animation_speed = 0.1
+        self.death_timer = MINION_DEATH_FRAMES
+        self.direction_x = 1 if x < SCREEN_WIDTH // 2 else -1 # Head for the middle first
+        self.velocity_y = 0
+        self.jump_speed = -16
+        self.gravity = 0.8
+
+    def update(self):
+        if self.state == 'dying':
+            # Drop out of the fight
+            self.rect.y += 8
+            self.death_timer -= 1
+            if self.death_timer <= 0:
+                self.expired = True
+            return
+        self.frame_index += self.animation_speed
+        if self.frame_index >= 2: self.frame_index = 0
+        self.image = self.sprites['walk_a' if self.frame_index < 1 else 'walk_b']
+        self.move()
+
+    def get_attack_settings(self):
+        return self.attacks
+
+    def can_shoot(self):
+        return True
+
+    def defeated(self):
+        return self.health <= 0
+
+    def trigger_death(self):
+        self.state = 'dying'
+        self.image = self.sprites.get('death', self.sprites['idle'])
+        if self.particles is not None:
+            self.particles.emit('burst', *self.rect.center, 20)
+
+    def take_damage(self, amount, at=None):
+        if self.state != 'dying':
+            if self.particles is not None:
+                self.particles.emit('spark', *(at or self.rect.center), 4)
+            self.health -= amount
@@ -0,0 +1,150 @@
+"""Boss definitions as data: sprites, movement program, attacks and cooldown per phase.
+
+Adding a boss means adding an entry to BOSS_DEFINITIONS. Boss compiles each
+definition once into dispatch tables (see boss.compile_boss), so nothing in
+here is looked at per frame. Minions use the same fields for their single
+phase, plus health; ENCOUNTERS lists which hostiles a battle starts with.
+
+    sprites   (base path, scale, {state: file suffix}); phases may share one
+    move      (movement program, {parameter: value}); programs are Boss.move_<name>
+    attacks   list of (bullet_type, scale, speed, angle_offset) aimed shots and/or
+              pattern dicts: {'pattern': name, 'bullet', 'scale', 'speed', **params}
+              (see patterns.py for the patterns and their parameters)
+    cooldown  frames between volleys
+"""
+from settings import *
+
+SLIME_SPIKE_SPRITES = (f"{ASSET_DIR}/Sprites/Enemies/Double/slime_spike_", 2.5,
+                       {'idle': 'rest', 'walk_a': 'walk_a', 'walk_b': 'walk_b'})
+SLIME_NORMAL_SPRITES = (f"{BOSS_SPRITE_PATH}/slime_normal_", 5,
+                        {'idle': 'rest', 'walk_a': 'walk_a', 'walk_b': 'walk_b', 'death': 'flat'})
+SLIME_FIRE_SPRITES = (f"{BOSS_SPRITE_PATH}/slime_fire_", 5,
+                      {'idle': 'rest', 'walk_a': 'walk_a', 'walk_b': 'walk_b', 'death': 'flat'})
+BEE_SPRITES = (f"{BOSS_SPRITE_PATH}/bee_", 5,
+               {'idle': 'rest', 'walk_a': 'a', 'walk_b': 'b'})
+LADYBUG_SPRITES = (f"{BOSS_SPRITE_PATH}/ladybug_", 5,
+                   {'idle': 'rest', 'walk_a': 'walk_a', 'walk_b': 'walk_b', 'death': 'fly'})
+
+BOSS_DEFINITIONS = {
+    # Slime King: hops in, sits on the ground, then flies along the top
+    'slime': {
+        'intro': {
+            'sprites': SLIME_SPIKE_SPRITES,
+            'move': ('hop', {'speed': 5}),
+            'attacks': [('brick', 0.5, 8, 0)],
+            'cooldown': 120,
+        },
+        'phase1': {
+            'sprites': SLIME_NORMAL_SPRITES,
+            'move': ('hold_ground', {}),
+            'attacks': [('brick', 0.5, 8, 0)],
+            'cooldown': 120,
+        },
+        'phase2': {
+            'sprites': SLIME_FIRE_SPRITES,
+            'move': ('rise_strafe', {'speed': 10}),
+            'attacks': [('brick', 0.5, 8, 0)],
+            'cooldown': 60, # Faster shooting in phase 2
+        },
+    },
+    # Bee: fast stingers, figure-eight hover, then strafing with bursts and a turning curtain
+    'bee': {
+        'intro': {
+            'sprites': BEE_SPRITES,
+            'move': ('hop', {'speed': 5, 'hover_y': SCREEN_HEIGHT // 2, 'boost': 10}),
+            'attacks': [('brick', 0.4, 10, 0)],
+            'cooldown': 45,
+        },
+        'phase1': {
+            'sprites': BEE_SPRITES,
+            'move': ('figure_eight', {'center': (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 3),
+                                      'radius': (300, 100), 'rate': 0.002}),
+            'attacks': [('brick', 0.4, 10, 0)],
+            'cooldown': 45,
+        },
+        'phase2': {
+            'sprites': BEE_SPRITES,
+            'move': ('strafe_wave', {'speed': 12, 'y': 150, 'amplitude': 50, 'rate': 0.01}),
+            'attacks': [('brick', 0.4, 8, -10), ('brick', 0.4, 8, 0), ('brick', 0.4, 8, 10),
+                        # 100-shot ring that turns a little every volley; dash through it
+                        {'pattern': 'spiral', 'bullet': 'brick', 'scale': 0.2, 'speed': 3, 'count': 100, 'step': 5}],
+            'cooldown': 100,
+        },
+    },
+    # Ladybug: slow block shots on the ground, then dropped from the ceiling
+    'ladybug': {
+        'intro': {
+            'sprites': LADYBUG_SPRITES,
+            'move': ('hop', {'speed': 5}),
+            'attacks': [('brick', 1.5, 6, 0)],
+            'cooldown': 150,
+        },
+        'phase1': {
+            'sprites': LADYBUG_SPRITES,
+            'move': ('patrol', {'speed': 7, 'margin': 50}),
+            'attacks': [('brick', 1.5, 6, 0)],
+            'cooldown': 150,
+        },
+        'phase2': {
+            'sprites': LADYBUG_SPRITES,
+            'move': ('rise_strafe', {'speed': 8}),
+            'attacks': [('brick', 1.5, 10, 90)], # Shoot downwards
+            'cooldown': 100,
+        },
+    },
+}
+
+DEFAULT_BOSS = 'slime' # Used for unknown boss types
+
+MINION_DEFINITIONS = {
+    # Fly: weaves across the sky, dropping the odd slow shot
+    'fly': {
+        'sprites': (f"{BOSS_SPRITE_PATH}/fly_", 1,
+                    {'idle': 'rest', 'walk_a': 'a', 'walk_b': 'b'}),
+        'move': ('strafe_wave', {'speed': 3, 'y': 150, 'amplitude': 40, 'rate': 0.004}),
+        'attacks': [('brick', 0.3, 5, 0)],
+        'cooldown': 180,
+        'health': 10,
+    },
+    # Mouse: runs along the ground into the player
+    'mouse': {
+        'sprites': (f"{BOSS_SPRITE_PATH}/mouse_", 1,
+                    {'idle': 'rest', 'walk_a': 'walk_a', 'walk_b': 'walk_b'}),
+        'move': ('patrol', {'speed': 4, 'margin': 0}),
+        'attacks': [],
+        'cooldown': 60,
+        'health': 15,
+    },
+}
+
+BOSS_START = (SCREEN_WIDTH - 200, SCREEN_HEIGHT - 200)
+
+# Hostiles a battle starts with, as (kind, name, position) or, for minions,
+# (kind, name, position, movement parameter overrides). The first boss is
+# the battle's main boss: the one map progress, bots and replays refer to.
+ENCOUNTERS = {
+    'slime': [('boss', 'slime', BOSS_START)],
+    'bee': [('boss', 'bee', BOSS_START)],
+    'ladybug': [('boss', 'ladybug', BOSS_START)],
+    # Bee queen with a swarm of flies in three bands
+    'hive': [('boss', 'bee', BOSS_START)] + [
+        ('minion', 'fly', (120 + 160 * i, y), {'y': y}) for y in (100, 180, 260) for i in range(7)
+    ],
+    # Slime King and Ladybug at once, with mice underfoot
+    'twins': [
+        ('boss', 'slime', BOSS_START),
+        ('boss', 'ladybug', (200, SCREEN_HEIGHT - 200)),
+        ('minion', 'mouse', (SCREEN_WIDTH // 3, SCREEN_HEIGHT - 80)),
+        ('minion', 'mouse', (2 * SCREEN_WIDTH // 3, SCREEN_HEIGHT - 80)),
+    ],
+}
+
+def get_definition(boss_type):
+    return BOSS_DEFINITIONS.get(boss_type, BOSS_DEFINITIONS[DEFAULT_BOSS])
+
+def get_minion_definition(minion_type):
+    return MINION_DEFINITIONS[minion_type]
+
+def get_encounter(name):
+    # A plain boss type is a fight against that boss alone
+    return ENCOUNTERS.get(name, [('boss', name, BOSS_START)])
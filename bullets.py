@@ -1,48 +1,291 @@
 import pygame
 import math
+import numpy as np
 from settings import *
 from sprite_loader import SpriteLoader
+from collision import SpatialHash, mask_cache, get_collision_mode
 
-class Bullet(pygame.sprite.Sprite):
-    def __init__(self, x, y, direction, scale=0.7):
-        super().__init__()
-        self.image = SpriteLoader.get_projectile_sprite('fireball', scale) 
-        # Rotate based on direction
+OWNER_PLAYER = 0
+OWNER_BOSS = 1
+
+PLAYER_BULLET_SPEED = 12
+
+class BulletManager:
+    """All live projectiles stored as parallel NumPy arrays.
+
+    Positions are float centers, so bullets keep sub-pixel precision. Freed
+    slots go on a free-list and are reused by later spawns; the arrays only
+    grow when every slot up to the capacity is in use.
+    """
+    def __init__(self, capacity=BULLET_CAPACITY):
+        self.capacity = capacity
+        self.x = np.zeros(capacity, dtype=np.float64)
+        self.y = np.zeros(capacity, dtype=np.float64)
+        self.px = np.zeros(capacity, dtype=np.float64) # Position before the last update
+        self.py = np.zeros(capacity, dtype=np.float64)
+        self.vx = np.zeros(capacity, dtype=np.float64)
+        self.vy = np.zeros(capacity, dtype=np.float64)
+        self.sprite = np.zeros(capacity, dtype=np.int32)
+        self.owner = np.zeros(capacity, dtype=np.int8)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.free = list(range(capacity - 1, -1, -1))
+        self.top = 0 # One past the highest slot ever used
+
+        # Sprite registry: id -> surface and its half extents
+        self.surfaces = []
+        self.sprite_ids = {}
+        self.half_w = np.zeros(0, dtype=np.float64)
+        self.half_h = np.zeros(0, dtype=np.float64)
+        self.surface_keys = np.zeros(0, dtype=np.int64) # id() of each surface, for RenderQueue
+
+        # Broadphase, rebuilt lazily after bullets move or spawn
+        self.grid = SpatialHash()
+        self.grid_dirty = True
+
+    def sprite_id(self, surface):
+        sid = self.sprite_ids.get(surface)
+        if sid is None:
+            sid = len(self.surfaces)
+            self.surfaces.append(surface)
+            self.sprite_ids[surface] = sid
+            self.half_w = np.append(self.half_w, surface.get_width() / 2)
+            self.half_h = np.append(self.half_h, surface.get_height() / 2)
+            self.surface_keys = np.append(self.surface_keys, id(surface))
+        return sid
+
+    def grow(self):
+        old = self.capacity
+        self.capacity = old * 2
+        for name in ('x', 'y', 'px', 'py', 'vx', 'vy', 'sprite', 'owner', 'alive'):
+            column = getattr(self, name)
+            grown = np.zeros(self.capacity, dtype=column.dtype)
+            grown[:old] = column
+            setattr(self, name, grown)
+        self.free.extend(range(self.capacity - 1, old - 1, -1))
+
+    def spawn(self, x, y, vx, vy, surface, owner):
+        if not self.free:
+            self.grow()
+        i = self.free.pop()
+        self.x[i] = x
+        self.y[i] = y
+        self.px[i] = x
+        self.py[i] = y
+        self.vx[i] = vx
+        self.vy[i] = vy
+        self.sprite[i] = self.sprite_id(surface)
+        self.owner[i] = owner
+        self.alive[i] = True
+        if i >= self.top:
+            self.top = i + 1
+        self.grid_dirty = True
+        return i
+
+    def spawn_many(self, x, y, vx, vy, sprites, owner):
+        """Spawn len(vx) bullets from (x, y) at once; sprites are registry ids.
+
+        Slots come off the free-list in the same order repeated spawn() calls
+        would take them. Returns the slots.
+        """
+        n = len(vx)
+        if n == 0:
+            return np.zeros(0, dtype=np.int64)
+        while len(self.free) < n:
+            self.grow()
+        slots = np.array(self.free[:-n - 1:-1], dtype=np.int64)
+        del self.free[-n:]
+        self.x[slots] = x
+        self.y[slots] = y
+        self.px[slots] = x
+        self.py[slots] = y
+        self.vx[slots] = vx
+        self.vy[slots] = vy
+        self.sprite[slots] = sprites
+        self.owner[slots] = owner
+        self.alive[slots] = True
+        self.top = max(self.top, int(slots.max()) + 1)
+        self.grid_dirty = True
+        return slots
+
+    def spawn_player_bullet(self, x, y, direction, scale=0.7):
+        # Rotate based on direction (picked from the pre-rotated table)
         angle = math.degrees(math.atan2(-direction.y, direction.x))
-        self.image = pygame.transform.rotate(self.image, angle)
-        self.rect = self.image.get_rect(center=(x, y))
-        self.direction = direction
-        self.speed = 12
+        image = SpriteLoader.get_rotated_projectile('fireball', scale, angle)
+        return self.spawn(x, y, direction.x * PLAYER_BULLET_SPEED, direction.y * PLAYER_BULLET_SPEED, image, OWNER_PLAYER)
 
-    def update(self):
-        self.rect.x += self.direction.x * self.speed
-        self.rect.y += self.direction.y * self.speed
-        
-        if not (0 <= self.rect.x <= SCREEN_WIDTH and 0 <= self.rect.y <= SCREEN_HEIGHT):
-            self.kill()
-
-class BossBullet(pygame.sprite.Sprite):
-    def __init__(self, x, y, target_x, target_y, bullet_type='brick', scale=0.5, speed=8, angle_offset=0):
-        super().__init__()
-        self.image = SpriteLoader.get_projectile_sprite(bullet_type, scale)
-        
+    def spawn_boss_bullet(self, x, y, target_x, target_y, bullet_type='brick', scale=0.5, speed=8, angle_offset=0):
         # Calculate direction to target
         direction = pygame.math.Vector2(target_x - x, target_y - y)
         if direction.length() > 0:
-            self.direction = direction.normalize()
+            direction = direction.normalize()
         else:
-            self.direction = pygame.math.Vector2(-1, 0)
-        
+            direction = pygame.math.Vector2(-1, 0)
+
         # Apply angle offset for spread shots
         if angle_offset != 0:
-            self.direction = self.direction.rotate(angle_offset)
+            direction = direction.rotate(angle_offset)
+
+        angle = math.degrees(math.atan2(-direction.y, direction.x))
+        image = SpriteLoader.get_rotated_projectile(bullet_type, scale, angle)
+        return self.spawn(x, y, direction.x * speed, direction.y * speed, image, OWNER_BOSS)
+
+    def kill(self, indices):
+        self.alive[indices] = False
+        self.free.extend(np.asarray(indices).tolist())
+
+    def live_indices(self, owner=None):
+        live = self.alive[:self.top]
+        if owner is not None:
+            live = live & (self.owner[:self.top] == owner)
+        return np.flatnonzero(live)
+
+    def count(self, owner=None):
+        return len(self.live_indices(owner))
 
-        self.rect = self.image.get_rect(center=(x, y))
-        self.speed = speed
+    def rects(self, indices, alpha=1.0):
+        """Integer (left, top, width, height) columns for the given bullets.
+
+        alpha < 1 places them between their previous and current positions.
+        """
+        sid = self.sprite[indices]
+        hw = self.half_w[sid]
+        hh = self.half_h[sid]
+        x = self.x[indices]
+        y = self.y[indices]
+        if alpha != 1.0:
+            px = self.px[indices]
+            py = self.py[indices]
+            x = px + (x - px) * alpha
+            y = py + (y - py) * alpha
+        left = np.floor(x - hw).astype(np.int32)
+        top = np.floor(y - hh).astype(np.int32)
+        return left, top, (hw * 2).astype(np.int32), (hh * 2).astype(np.int32)
 
     def update(self):
-        self.rect.centerx += self.direction.x * self.speed
-        self.rect.centery += self.direction.y * self.speed
-        
-        if not (-100 <= self.rect.centerx <= SCREEN_WIDTH + 100 and -100 <= self.rect.centery <= SCREEN_HEIGHT + 100):
-            self.kill()
+        n = self.top
+        if n == 0:
+            return
+        alive = self.alive[:n]
+        x = self.x[:n]
+        y = self.y[:n]
+        self.px[:n] = x
+        self.py[:n] = y
+        x += self.vx[:n] * alive
+        y += self.vy[:n] * alive
+        self.grid_dirty = True
+
+        # Player shots die once their top-left leaves the screen, boss shots
+        # once their center is more than 100px outside it
+        sid = self.sprite[:n]
+        left = x - self.half_w[sid]
+        top = y - self.half_h[sid]
+        player_in = (left >= 0) & (left <= SCREEN_WIDTH) & (top >= 0) & (top <= SCREEN_HEIGHT)
+        boss_in = (x >= -100) & (x <= SCREEN_WIDTH + 100) & (y >= -100) & (y <= SCREEN_HEIGHT + 100)
+        inside = np.where(self.owner[:n] == OWNER_PLAYER, player_in, boss_in)
+
+        culled = np.flatnonzero(alive & ~inside)
+        if len(culled):
+            self.kill(culled)
+
+    def rebuild_grid(self):
+        indices = self.live_indices()
+        left, top, w, h = self.rects(indices)
+        self.grid.build(indices, left, top, w, h)
+        self.grid_dirty = False
+
+    def collide_rect(self, rect, owner, dokill=True):
+        """Indices of `owner` bullets overlapping rect, like spritecollide on a Group."""
+        if self.top < BROADPHASE_MIN_BULLETS:
+            # Too few slots for the grid to pay for its own bookkeeping
+            candidates = self.live_indices(owner)
+        else:
+            if self.grid_dirty:
+                self.rebuild_grid()
+            candidates = self.grid.query(rect)
+            # Slots killed since the last rebuild are still filed in the grid
+            candidates = candidates[self.alive[candidates] & (self.owner[candidates] == owner)]
+        if len(candidates) == 0:
+            return candidates
+        left, top, w, h = self.rects(candidates)
+        hit = (left < rect.right) & (left + w > rect.left) & (top < rect.bottom) & (top + h > rect.top)
+        hits = candidates[hit]
+        self.grid.record(len(candidates), len(hits))
+        if dokill and len(hits):
+            self.kill(hits)
+        return hits
+
+    def collide_boxes(self, boxes, owner):
+        """(box, slot) pairs of `owner` bullets overlapping each (x, y, w, h) row of boxes.
+
+        Same broadphase and tested/hit accounting as collide_rect, for many
+        rects in one pass. Kills nothing.
+        """
+        x, y, w, h = (column.astype(np.int64) for column in boxes.T)
+        if self.top < BROADPHASE_MIN_BULLETS:
+            live = self.live_indices(owner)
+            box = np.repeat(np.arange(len(x)), len(live))
+            candidates = np.tile(live, len(x))
+        else:
+            if self.grid_dirty:
+                self.rebuild_grid()
+            box, candidates = self.grid.query_many(x, y, x + w, y + h)
+            keep = self.alive[candidates] & (self.owner[candidates] == owner)
+            box, candidates = box[keep], candidates[keep]
+        if len(candidates) == 0:
+            return box, candidates
+        left, top, bw, bh = self.rects(candidates)
+        bx, by = x[box], y[box]
+        hit = (left < bx + w[box]) & (left + bw > bx) & (top < by + h[box]) & (top + bh > by)
+        self.grid.record(len(candidates), int(hit.sum()))
+        return box[hit], candidates[hit]
+
+    def any_in_rect(self, rect, owner):
+        """Whether any `owner` bullet overlaps rect. Read-only: kills nothing, records nothing."""
+        candidates = self.live_indices(owner)
+        if len(candidates) == 0:
+            return False
+        left, top, w, h = self.rects(candidates)
+        return bool(((left < rect.right) & (left + w > rect.left) & (top < rect.bottom) & (top + h > rect.top)).any())
+
+    def collide_sprite(self, sprite, owner, dokill=True, mode=None):
+        """Like collide_rect, but honours the rect/mask/hybrid collision mode."""
+        mode = mode or get_collision_mode()
+        if mode == 'mask':
+            # No rect prefilter: every bullet of that owner gets a mask test
+            candidates = self.live_indices(owner)
+        else:
+            candidates = self.collide_rect(sprite.rect, owner, dokill=False)
+
+        if mode != 'rect' and len(candidates):
+            candidates = self.mask_filter(sprite, candidates)
+
+        if dokill and len(candidates):
+            self.kill(candidates)
+        return candidates
+
+    def mask_filter(self, sprite, candidates):
+        """The candidates whose pixels overlap sprite's."""
+        target = mask_cache.get(sprite.image)
+        left, top, _, _ = self.rects(candidates)
+        sprites = self.sprite[candidates].tolist()
+        ox, oy = sprite.rect.x, sprite.rect.y
+        keep = [
+            target.overlap(mask_cache.get(self.surfaces[s]), (lx - ox, ty - oy)) is not None
+            for s, lx, ty in zip(sprites, left.tolist(), top.tolist())
+        ]
+        return candidates[np.array(keep, dtype=bool)]
+
+    def blit_pairs(self, indices, alpha=1.0):
+        # (surface, position) pairs for the given bullets, plus their surface keys
+        left, top, _, _ = self.rects(indices, alpha)
+        surfaces = self.surfaces
+        sprites = self.sprite[indices]
+        pairs = [(surfaces[s], (lx, ty)) for s, lx, ty in zip(sprites.tolist(), left.tolist(), top.tolist())]
+        return pairs, self.surface_keys[sprites]
+
+    def enqueue(self, queue, player_layer, boss_layer, alpha=1.0):
+        """Queue every live bullet on a RenderQueue, each owner on its own layer."""
+        for owner, layer in ((OWNER_PLAYER, player_layer), (OWNER_BOSS, boss_layer)):
+            indices = self.live_indices(owner)
+            if len(indices):
+                queue.add_many(layer, *self.blit_pairs(indices, alpha))
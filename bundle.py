@@ -0,0 +1,246 @@
+"""Precompiled asset bundle: every sprite the game loads, already decoded and scaled.
+
+    python bundle.py [--workers N] [--force]
+
+The bundle is a single file: a small header, a JSON index and raw RGBA/RGB
+pixel blobs at their final size. At runtime it is mmap'd and surfaces are
+made with pygame.image.frombuffer, so no PNG is decoded or rescaled.
+Rebuilds are incremental: blobs whose source files are unchanged are
+copied over from the previous bundle, and only the rest are re-rendered
+(in parallel, one process per core).
+"""
+import os
+import json
+import mmap
+import time
+import struct
+import argparse
+import pygame
+from concurrent.futures import ProcessPoolExecutor
+from settings import *
+
+MAGIC = b'CUPHBNDL'
+BUNDLE_VERSION = 1
+HEADER = struct.Struct('<8sII') # magic, version, index length
+BLOB_ALIGN = 16
+
+# Pixel layout by load mode: convert_alpha() sources keep alpha
+MODE_FORMATS = {'alpha': 'RGBA', 'opaque': 'RGB'}
+
+def key_to_json(key):
+    path, scale, mode = key
+    return [os.path.relpath(path, ASSET_DIR), list(scale) if isinstance(scale, tuple) else scale, mode]
+
+def key_from_json(entry_key):
+    rel, scale, mode = entry_key
+    return (f"{ASSET_DIR}/{rel}", tuple(scale) if isinstance(scale, list) else scale, mode)
+
+def file_signature(rel):
+    stat = os.stat(os.path.join(ASSET_DIR, rel))
+    return [rel, stat.st_mtime_ns, stat.st_size]
+
+class AssetBundle:
+    """Read-only view of a built bundle, memory-mapped.
+
+    Entries whose source files changed since the build are dropped when the
+    bundle is opened, so a stale bundle falls back to the PNGs instead of
+    serving old pixels.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, index_length = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != BUNDLE_VERSION:
+            raise ValueError(f"{path} is not a version {BUNDLE_VERSION} asset bundle")
+        index = json.loads(self.map[HEADER.size:HEADER.size + index_length])
+        self.data_start = index['data_start']
+        self.stale = 0
+
+        current = {}
+        self.entries = {}
+        for entry in index['entries']:
+            fresh = True
+            for rel, mtime_ns, size in entry['sources']:
+                if rel not in current:
+                    try:
+                        current[rel] = file_signature(rel)
+                    except OSError:
+                        current[rel] = None
+                if current[rel] != [rel, mtime_ns, size]:
+                    fresh = False
+            if fresh:
+                self.entries[key_from_json(entry['key'])] = entry
+            else:
+                self.stale += 1
+
+    @classmethod
+    def open(cls, path=ASSET_BUNDLE_PATH):
+        """The bundle at path, or None when it is missing or unreadable."""
+        if not os.path.exists(path):
+            return None
+        try:
+            return cls(path)
+        except (ValueError, OSError, KeyError) as e:
+            print(f"Ignoring asset bundle {path}: {e}")
+            return None
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def view(self, key):
+        """Surface whose pixels live in the mapped file. Never draw onto it."""
+        entry = self.entries[key]
+        start = self.data_start + entry['offset']
+        pixels = memoryview(self.map)[start:start + entry['size']]
+        return pygame.image.frombuffer(pixels, (entry['width'], entry['height']), entry['format'])
+
+    def surface(self, key):
+        # A private, writable copy that needs no display (safe off the main thread)
+        return self.view(key).copy()
+
+def discover_manifest():
+    """Every (path, scale, mode) the game loads, found by building each scene once.
+
+    Runs the real constructors on the dummy video driver with the bundle
+    switched off, so the manifest can never drift from the code.
+    """
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    import sprite_loader
+    from sprite_loader import SpriteLoader, sprite_cache
+    from main import Battle, new_player_data
+    from boss_defs import ENCOUNTERS
+    from overworld import Island1, Island2
+    from shop import Shop
+    from menu import Menu
+
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    sprite_loader.asset_bundle = None
+    sprite_cache.budget_bytes = float('inf') # Keep every key for the manifest
+    sprite_cache.evict()
+
+    for boss_type in ('slime', 'bee', 'ladybug'):
+        battle = Battle(screen, boss_type)
+        for phase in ('intro', 'phase1', 'phase2'):
+            battle.boss.transition_to_phase(phase)
+            for volley in battle.boss.get_attack_settings():
+                SpriteLoader.get_projectile_sprite(volley.bullet_type, volley.scale)
+    for name in ENCOUNTERS: # Minions and multi-boss line-ups
+        for entity in Battle(screen, name).hostiles:
+            for volley in entity.get_attack_settings():
+                SpriteLoader.get_projectile_sprite(volley.bullet_type, volley.scale)
+    for scale in (0.7, 1.2): # Player shots, normal and with the 'wide' power
+        SpriteLoader.get_projectile_sprite('fireball', scale)
+
+    player_data = new_player_data()
+    island = Island1(screen, player_data['defeated_bosses'])
+    player_data.update(defeated_bosses=['slime', 'bee', 'ladybug'], has_key=True, is_portal_unlocked=True)
+    island.apply_progress(player_data)
+    try:
+        Island2(screen)
+    except (pygame.error, FileNotFoundError) as e:
+        print(f"Island2 assets incomplete, skipped: {e}")
+    Shop(screen)
+    Menu(screen, player_data)
+    return list(sprite_cache.surfaces)
+
+def source_files(path, indexes):
+    """Asset-relative files whose contents make up the pixels of path."""
+    from sprite_loader import atlas_frame_path, read_atlas_index
+    xml_path, name = atlas_frame_path(path)
+    if xml_path is not None and os.path.exists(xml_path):
+        if xml_path not in indexes:
+            indexes[xml_path] = read_atlas_index(xml_path)
+        sheet_path, rects = indexes[xml_path]
+        if name in rects:
+            return [os.path.relpath(xml_path, ASSET_DIR), os.path.relpath(sheet_path, ASSET_DIR)]
+    return [os.path.relpath(path, ASSET_DIR)]
+
+# Raw spritesheets decoded by this worker process
+_worker_sheets = {}
+
+def render_blob(key):
+    """Worker: decode and scale one asset to its final raw pixels."""
+    from sprite_loader import decode_scaled
+    path, scale, mode = key
+    image = decode_scaled(path, scale, _worker_sheets)
+    fmt = MODE_FORMATS[mode]
+    return image.get_width(), image.get_height(), fmt, pygame.image.tobytes(image, fmt)
+
+def build_bundle(path=ASSET_BUNDLE_PATH, workers=None, force=False):
+    """(Re)build the bundle at path; returns (assets rendered, assets reused)."""
+    keys = discover_manifest()
+    indexes = {}
+    sources = {key: [file_signature(rel) for rel in source_files(key[0], indexes)] for key in keys}
+
+    previous = None if force else AssetBundle.open(path)
+    reused = {}
+    todo = []
+    for key in keys:
+        if previous is not None and key in previous:
+            entry = previous.entries[key]
+            if entry['sources'] == sources[key]:
+                start = previous.data_start + entry['offset']
+                reused[key] = (entry['width'], entry['height'], entry['format'],
+                               previous.map[start:start + entry['size']])
+                continue
+        todo.append(key)
+
+    # Keys sharing a spritesheet go to the same worker batch
+    todo.sort(key=lambda key: key[0])
+    rendered = {}
+    if todo:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunksize = max(1, len(todo) // ((workers or os.cpu_count() or 1) * 4))
+            for key, blob in zip(todo, pool.map(render_blob, todo, chunksize=chunksize)):
+                rendered[key] = blob
+    if previous is not None:
+        previous.map.close()
+
+    entries = []
+    blobs = []
+    offset = 0
+    for key in keys:
+        width, height, fmt, pixels = rendered[key] if key in rendered else reused[key]
+        entries.append({'key': key_to_json(key), 'offset': offset, 'size': len(pixels),
+                        'width': width, 'height': height, 'format': fmt, 'sources': sources[key]})
+        padding = -len(pixels) % BLOB_ALIGN
+        blobs.append(pixels + bytes(padding))
+        offset += len(pixels) + padding
+
+    # The index records where the data starts, which depends on its own length
+    data_start = 0
+    while True:
+        index = json.dumps({'data_start': data_start, 'entries': entries}).encode()
+        needed = HEADER.size + len(index)
+        needed += -needed % BLOB_ALIGN
+        if needed == data_start:
+            break
+        data_start = needed
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, BUNDLE_VERSION, len(index)))
+        f.write(index)
+        f.write(bytes(data_start - HEADER.size - len(index)))
+        for blob in blobs:
+            f.write(blob)
+    os.replace(tmp_path, path) # Readers never see a half-written bundle
+    return len(rendered), len(reused)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the precompiled asset bundle")
+    parser.add_argument('--out', default=ASSET_BUNDLE_PATH)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--force', action='store_true', help='re-render every asset')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    rendered, reused = build_bundle(args.out, args.workers, args.force)
+    elapsed = time.perf_counter() - start
+    print(f"{args.out}: {rendered} rendered, {reused} reused, "
+          f"{os.path.getsize(args.out) / 1e6:.1f} MB in {elapsed:.2f}s")
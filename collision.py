@@ -0,0 +1,136 @@
+import weakref
+import numpy as np
+import pygame
+from settings import *
+
+COLLISION_MODES = ('rect', 'mask', 'hybrid')
+
+# Cell coordinates are shifted by CELL_OFFSET so off-screen (negative) cells
+# still pack into a single non-negative int64 key
+CELL_OFFSET = 1024
+CELL_STRIDE = 1 << 20
+
+class SpatialHash:
+    """Uniform-grid broadphase over axis-aligned boxes stored as NumPy columns.
+
+    Each box is filed under the cell of its top-left corner; queries widen the
+    searched cells by the largest box size, so a box spanning several cells
+    is still found. Keys are kept sorted, so every grid row of a query is one
+    searchsorted slice.
+    """
+    def __init__(self, cell_size=COLLISION_CELL_SIZE):
+        self.cell_size = cell_size
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.max_w = 0
+        self.max_h = 0
+
+        # Pairs handed to the narrowphase vs pairs that actually overlapped
+        self.tested = 0
+        self.hit = 0
+        self.last_tested = 0
+        self.last_hit = 0
+
+    def build(self, ids, left, top, w, h):
+        cx = left // self.cell_size
+        cy = top // self.cell_size
+        keys = (cy.astype(np.int64) + CELL_OFFSET) * CELL_STRIDE + (cx + CELL_OFFSET)
+        order = np.argsort(keys, kind='stable')
+        self.keys = keys[order]
+        self.ids = np.asarray(ids)[order]
+        self.max_w = int(w.max()) if len(w) else 0
+        self.max_h = int(h.max()) if len(h) else 0
+
+    def query(self, rect):
+        """Ids of every box that may overlap rect (a superset of the real hits)."""
+        if len(self.keys) == 0:
+            return self.ids
+        cs = self.cell_size
+        x0 = (rect.left - self.max_w) // cs + CELL_OFFSET
+        x1 = (rect.right - 1) // cs + CELL_OFFSET
+        y0 = (rect.top - self.max_h) // cs + CELL_OFFSET
+        y1 = (rect.bottom - 1) // cs + CELL_OFFSET
+        rows = np.arange(y0, y1 + 1, dtype=np.int64) * CELL_STRIDE
+        lo = np.searchsorted(self.keys, rows + x0, 'left')
+        hi = np.searchsorted(self.keys, rows + x1, 'right')
+        return np.concatenate([self.ids[a:b] for a, b in zip(lo.tolist(), hi.tolist())])
+
+    def query_many(self, left, top, right, bottom):
+        """(box, id) candidate pairs for many query boxes at once, like query() per box."""
+        n = len(left)
+        if len(self.keys) == 0 or n == 0:
+            return np.repeat(np.arange(n), len(self.ids)), np.tile(self.ids, n)
+        cs = self.cell_size
+        x0 = (left - self.max_w) // cs + CELL_OFFSET
+        x1 = (right - 1) // cs + CELL_OFFSET
+        y0 = (top - self.max_h) // cs + CELL_OFFSET
+        y1 = (bottom - 1) // cs + CELL_OFFSET
+        # One searchsorted slice per (box, grid row)
+        row_counts = np.maximum(y1 - y0 + 1, 0)
+        box = np.repeat(np.arange(n), row_counts)
+        first_row = np.cumsum(row_counts) - row_counts
+        rows = (y0[box] + np.arange(len(box)) - first_row[box]).astype(np.int64) * CELL_STRIDE
+        lo = np.searchsorted(self.keys, rows + x0[box], 'left')
+        hi = np.searchsorted(self.keys, rows + x1[box], 'right')
+        lengths = np.maximum(hi - lo, 0)
+        starts = np.cumsum(lengths) - lengths
+        positions = np.repeat(lo - starts, lengths) + np.arange(lengths.sum())
+        return np.repeat(box, lengths), self.ids[positions]
+
+    def record(self, tested, hit):
+        self.tested += tested
+        self.hit += hit
+
+    def begin_frame(self):
+        self.last_tested = self.tested
+        self.last_hit = self.hit
+        self.tested = 0
+        self.hit = 0
+
+class MaskCache:
+    """Collision masks keyed by surface identity.
+
+    Sprite-cache frames, animation-bank variants and pre-rotated projectiles
+    are long-lived shared surfaces, so each gets its mask built exactly once.
+    Entries disappear together with their surface.
+    """
+    def __init__(self):
+        self.masks = weakref.WeakKeyDictionary()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, surface):
+        mask = self.masks.get(surface)
+        if mask is None:
+            self.misses += 1
+            mask = pygame.mask.from_surface(surface)
+            self.masks[surface] = mask
+        else:
+            self.hits += 1
+        return mask
+
+mask_cache = MaskCache()
+
+# 'rect': bounding boxes only, 'mask': pixel masks only, 'hybrid': rect then mask
+collision_mode = COLLISION_MODE
+
+def set_collision_mode(mode):
+    global collision_mode
+    if mode not in COLLISION_MODES:
+        raise ValueError(f"Unknown collision mode {mode!r}, expected one of {COLLISION_MODES}")
+    collision_mode = mode
+
+def get_collision_mode():
+    return collision_mode
+
+def collide(rect_a, image_a, rect_b, image_b, mode=None):
+    mode = mode or collision_mode
+    if mode != 'mask' and not rect_a.colliderect(rect_b):
+        return False
+    if mode == 'rect':
+        return True
+    offset = (rect_b.x - rect_a.x, rect_b.y - rect_a.y)
+    return mask_cache.get(image_a).overlap(mask_cache.get(image_b), offset) is not None
+
+def collide_sprites(a, b, mode=None):
+    return collide(a.rect, a.image, b.rect, b.image, mode)
@@ -0,0 +1,52 @@
+import pygame
+
+class KeyboardControls:
+    """Live keyboard state, read through pygame.key.get_pressed().
+
+    poll() snapshots the held keys once per step and held() reads that
+    snapshot. KEYDOWN events are queued with press() and handed to the
+    next simulation step by consume_pressed().
+    """
+    def __init__(self):
+        self.pressed_keys = set()
+        self.keys = None # Held-key snapshot from the last poll()
+
+    def poll(self):
+        self.keys = pygame.key.get_pressed()
+
+    def press(self, key):
+        self.pressed_keys.add(key)
+
+    def consume_pressed(self):
+        pressed = self.pressed_keys
+        self.pressed_keys = set()
+        return pressed
+
+    def held(self, key):
+        if self.keys is None:
+            self.poll()
+        return self.keys[key]
+
+class ScriptedControls:
+    """Programmatic input: the keys held and newly pressed on the current frame.
+
+    Used by the headless simulation, where there is no window to read keys from.
+    """
+    def __init__(self):
+        self.held_keys = frozenset()
+        self.pressed_keys = frozenset()
+
+    def set_frame(self, held=(), pressed=()):
+        self.held_keys = frozenset(held)
+        self.pressed_keys = frozenset(pressed)
+
+    def poll(self):
+        pass # set_frame() already fixes the frame's keys
+
+    def consume_pressed(self):
+        pressed = self.pressed_keys
+        self.pressed_keys = frozenset()
+        return pressed
+
+    def held(self, key):
+        return key in self.held_keys
@@ -0,0 +1,108 @@
+import numpy as np
+from settings import *
+from collision import collide_sprites, get_collision_mode
+
+class EntityStore:
+    """The hostile entities of a battle (bosses and minions), in spawn order.
+
+    Entities update themselves; the store mirrors their rects and whether
+    they can still be hit into NumPy columns, so testing every entity
+    against the player is one broadcast, and only entities whose rect is
+    touched get the exact sprite test. Bullets are found through the
+    bullets' own broadphase grid, for all entities in one query.
+
+    An entity has rect, image, prev_pos, state ('dying' once it is
+    beaten), expired (death animation over), shoot_timer, shoot_cooldown
+    and update(), can_shoot(), get_attack_settings(), take_damage(amount),
+    defeated() and trigger_death(). Boss and Minion both qualify.
+    """
+    def __init__(self):
+        self.entities = []
+        self.boxes = np.zeros((0, 4), dtype=np.int32) # x, y, w, h
+        self.solid = np.zeros(0, dtype=bool)
+        self.columns_dirty = True
+
+    def __iter__(self):
+        return iter(self.entities)
+
+    def __len__(self):
+        return len(self.entities)
+
+    def add(self, entity):
+        self.entities.append(entity)
+        self.columns_dirty = True
+        return entity
+
+    def snapshot(self):
+        # Positions before the sim step, for interpolated drawing
+        for entity in self.entities:
+            entity.prev_pos = entity.rect.topleft
+
+    def update(self):
+        entities = self.entities
+        for entity in entities:
+            entity.update()
+        # Drop entities whose death animation has finished
+        if any(entity.expired for entity in entities):
+            self.entities = [entity for entity in entities if not entity.expired]
+        self.columns_dirty = True
+
+    def sync(self):
+        entities = self.entities
+        self.boxes = np.array([tuple(entity.rect) for entity in entities], dtype=np.int32).reshape(-1, 4)
+        self.solid = np.fromiter((entity.state != 'dying' for entity in entities), dtype=bool, count=len(entities))
+        self.columns_dirty = False
+
+    def retire(self, entity):
+        """Start entity's death; it stops colliding straight away."""
+        entity.trigger_death()
+        if not self.columns_dirty:
+            self.solid[self.entities.index(entity)] = False
+
+    def standing(self):
+        return [entity for entity in self.entities if entity.state != 'dying']
+
+    def overlapping(self, rect):
+        """Solid entities whose rect overlaps rect."""
+        if self.columns_dirty:
+            self.sync()
+        x, y, w, h = self.boxes.T
+        hit = self.solid & (x < rect.right) & (x + w > rect.left) & (y < rect.bottom) & (y + h > rect.top)
+        return [self.entities[i] for i in np.flatnonzero(hit)]
+
+    def touching(self, sprite):
+        """Solid entities that collide with sprite (in the current collision mode)."""
+        return [entity for entity in self.overlapping(sprite.rect) if collide_sprites(sprite, entity)]
+
+    def collide_bullets(self, bullets, owner):
+        """(entity, bullet slots) for every entity struck by owner's bullets; the bullets die.
+
+        All solid entity rects go through the bullets' broadphase grid in one
+        query. A bullet over two entities is spent on the one spawned first.
+        """
+        if not self.entities:
+            return []
+        if self.columns_dirty:
+            self.sync()
+        solid = np.flatnonzero(self.solid)
+        if len(solid) == 0:
+            return []
+        box, slots = bullets.collide_boxes(self.boxes[solid], owner)
+        if len(slots) == 0:
+            return []
+        # Exact test per struck entity, in spawn order, on bullets not yet claimed
+        mode = get_collision_mode()
+        order = np.argsort(box, kind='stable')
+        box, slots = box[order], slots[order]
+        bounds = np.flatnonzero(np.diff(box)) + 1
+        results = []
+        for group in np.split(np.arange(len(box)), bounds):
+            hits = slots[group]
+            hits = hits[bullets.alive[hits]]
+            entity = self.entities[solid[box[group[0]]]]
+            if mode != 'rect' and len(hits):
+                hits = bullets.mask_filter(entity, hits)
+            if len(hits):
+                bullets.kill(hits)
+                results.append((entity, hits))
+        return results
@@ -0,0 +1,113 @@
+"""Fan headless boss fights out over every core and aggregate the results.
+
+    python farm.py --fights 20 --bots turret --workers 8 --jsonl results.jsonl
+
+Every boss type is fought with every loadout (subset of shop powers) by
+every bot, `fights` times with seeds 0..fights-1. Results stream in chunk by
+chunk as workers finish them, in completion order, and are folded into a
+per-(boss, loadout, bot) report.
+"""
+import os
+import json
+import time
+import argparse
+from itertools import combinations
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+BOSS_TYPES = ('slime', 'bee', 'ladybug')
+POWERS = ('hp', 'speed', 'wide', 'dash')
+BOT_NAMES = ('idle', 'turret') # Keys of simulation.BOTS
+
+def all_loadouts(powers=POWERS):
+    """Every subset of the shop powers, from nothing equipped to everything."""
+    return [combo for size in range(len(powers) + 1) for combo in combinations(powers, size)]
+
+def run_fight(task):
+    # Imported in the worker so the parent never needs pygame or the assets
+    from main import new_player_data
+    from simulation import BOTS, simulate_battle
+
+    boss_type, loadout, bot_name, seed = task
+    player_data = new_player_data()
+    player_data['powers'] = list(loadout)
+    player_data['equipped_powers'] = list(loadout)
+    result = simulate_battle(boss_type, BOTS[bot_name], player_data, seed=seed)
+    result['loadout'] = list(loadout)
+    result['bot'] = bot_name
+    return result
+
+def run_fights(tasks):
+    return [run_fight(task) for task in tasks]
+
+class Report:
+    """Running totals per (boss, loadout, bot), updated one fight at a time."""
+    def __init__(self):
+        self.rows = {}
+
+    def add(self, result):
+        key = (result['boss_type'], tuple(result['loadout']), result['bot'])
+        row = self.rows.setdefault(key, {'fights': 0, 'wins': 0, 'ttk': 0.0, 'damage': 0, 'shots': 0, 'frames': 0})
+        row['fights'] += 1
+        row['damage'] += result['damage_taken']
+        row['shots'] += result['bullets_fired']
+        row['frames'] += result['frames']
+        if result['outcome'] == 'KNOCKOUT':
+            row['wins'] += 1
+            row['ttk'] += result['time_to_kill']
+
+    def lines(self):
+        yield f"{'boss':<8} {'bot':<7} {'loadout':<22} {'fights':>6} {'win%':>6} {'ttk(s)':>7} {'dmg':>5} {'shots':>6}"
+        for (boss_type, loadout, bot), row in sorted(self.rows.items()):
+            n = row['fights']
+            ttk = f"{row['ttk'] / row['wins']:.1f}" if row['wins'] else '-'
+            yield (f"{boss_type:<8} {bot:<7} {'+'.join(loadout) or '(none)':<22} {n:>6} "
+                   f"{100 * row['wins'] / n:>6.1f} {ttk:>7} {row['damage'] / n:>5.2f} {row['shots'] / n:>6.1f}")
+
+def run_farm(boss_types=BOSS_TYPES, loadouts=None, bots=('turret',), fights=10, workers=None, jsonl=None):
+    loadouts = all_loadouts() if loadouts is None else loadouts
+    unknown = sorted(set(bots) - set(BOT_NAMES))
+    if unknown:
+        raise ValueError(f"Unknown bots {unknown}, expected some of {BOT_NAMES}")
+    tasks = [(boss_type, loadout, bot, seed)
+             for boss_type in boss_types
+             for loadout in loadouts
+             for bot in bots
+             for seed in range(fights)]
+    workers = workers or os.cpu_count()
+    report = Report()
+    sim_frames = 0
+
+    start = time.perf_counter()
+    out = open(jsonl, 'w') if jsonl else None
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Chunks keep the per-task IPC overhead small next to a fight's cost
+            chunksize = max(1, len(tasks) // (workers * 8))
+            chunks = [tasks[i:i + chunksize] for i in range(0, len(tasks), chunksize)]
+            futures = [executor.submit(run_fights, chunk) for chunk in chunks]
+            for future in as_completed(futures):
+                for result in future.result():
+                    report.add(result)
+                    sim_frames += result['frames']
+                    if out:
+                        out.write(json.dumps(result) + '\n')
+    finally:
+        if out:
+            out.close()
+    elapsed = time.perf_counter() - start
+
+    for line in report.lines():
+        print(line)
+    print(f"{len(tasks)} fights on {workers} workers in {elapsed:.1f}s "
+          f"({sim_frames / elapsed:.0f} sim frames/s)")
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--fights', type=int, default=10, help='fights per (boss, loadout, bot)')
+    parser.add_argument('--bosses', nargs='+', default=list(BOSS_TYPES), choices=BOSS_TYPES)
+    parser.add_argument('--bots', nargs='+', default=['turret'], choices=BOT_NAMES)
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: all cores)')
+    parser.add_argument('--jsonl', default=None, help='also write every fight result to this file')
+    args = parser.parse_args()
+    run_farm(args.bosses, bots=args.bots, fights=args.fights, workers=args.workers, jsonl=args.jsonl)
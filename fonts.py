@@ -0,0 +1,70 @@
+import pygame
+from collections import OrderedDict
+from settings import *
+
+# Every (family, size, bold) the UI uses, resolved once by preload()
+UI_FONTS = [
+    ('Arial', 100, True),
+    ('Arial', 80, True),
+    ('Arial', 64, True),
+    ('Arial', 36, False),
+    ('Arial', 32, True),
+    ('Arial', 32, False),
+    ('Arial', 24, True),
+    ('Arial', 20, False),
+]
+
+class FontRegistry:
+    """Resolves each (family, size, bold) through SysFont exactly once."""
+    def __init__(self):
+        self.fonts = {}
+
+    def get(self, family, size, bold=False):
+        key = (family, size, bold)
+        font = self.fonts.get(key)
+        if font is None:
+            font = pygame.font.SysFont(family, size, bold=bold)
+            self.fonts[key] = font
+        return font
+
+    def preload(self, specs=UI_FONTS):
+        for family, size, bold in specs:
+            self.get(family, size, bold)
+
+class TextCache:
+    """LRU cache of rendered text surfaces keyed by (font, text, colour, antialias)."""
+    def __init__(self, capacity=TEXT_CACHE_SIZE):
+        self.capacity = capacity
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def render(self, font_key, text, color, antialias=True):
+        key = (font_key, text, tuple(color), antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = fonts.get(*font_key).render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.capacity:
+            self.surfaces.popitem(last=False)
+            self.evictions += 1
+        return surface
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.surfaces),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+fonts = FontRegistry()
+text_cache = TextCache()
@@ -1,50 +1,124 @@
 import pygame
 import sys
+import time
 from settings import *
+from fonts import fonts, text_cache
 from sprite_loader import SpriteLoader
 from player import Player, Ghost
-from boss import Boss
-from bullets import Bullet, BossBullet
+from boss import Boss, Minion
+from boss_defs import get_encounter
+from entities import EntityStore
+from particles import ParticleSystem
+from bullets import BulletManager, OWNER_PLAYER, OWNER_BOSS
+from patterns import PatternEmitter
+from render import DirtyRenderer, RenderQueue
+from collision import COLLISION_MODES, set_collision_mode
+from controls import KeyboardControls
+from sim_clock import SimClock
+from profiler import profiler
+from replay import InputRecorder
+from prefetch import prefetcher
 from overworld import OverworldPlayer, OverworldNode, Island1, Island2
 
+# Battle render-queue layers, back to front
+LAYER_PLAYER = 0
+LAYER_HOSTILES = 1
+LAYER_PLAYER_SHOTS = 2
+LAYER_BOSS_SHOTS = 3
+LAYER_EFFECTS = 4
+LAYER_GHOSTS = 5
+LAYER_HUD = 6
+
+def new_player_data():
+    return {
+        'coins': 10,
+        'max_hp_base': 3,
+        'powers': [], # Owned powers
+        'equipped_powers': [], # Active powers
+        'defeated_bosses': [], # List of boss names/types defeated
+        'has_key': False, # Golden key to Island 2
+        'is_portal_unlocked': False, # Whether the door is open
+        'current_island': 1 # Track which island we're on
+    }
+
 class Battle:
-    def __init__(self, screen, boss_type='slime'):
+    def __init__(self, screen, boss_type='slime', controls=None, seed=None):
+        # screen is None for a headless battle (see simulation.py)
         self.screen = screen
         self.clock = pygame.time.Clock()
+        self.controls = controls if controls is not None else KeyboardControls()
+        self.sim_clock = SimClock(seed) # Fixed-step time and RNG for this fight
+        # Hit sparks, dash smoke and death bursts; purely visual, so headless fights skip them
+        self.particles = ParticleSystem() if screen is not None else None
         
         # Sprite Groups
         self.player_group = pygame.sprite.GroupSingle()
-        self.player = Player(100, SCREEN_HEIGHT - 150)
+        self.player = Player(100, SCREEN_HEIGHT - 150, self.controls, self.sim_clock)
+        self.player.particles = self.particles
         self.player_group.add(self.player)
 
-        self.boss_group = pygame.sprite.GroupSingle()
-        self.boss = Boss(SCREEN_WIDTH - 200, SCREEN_HEIGHT - 200, boss_type)
-        self.boss_group.add(self.boss)
+        # Hostiles: the encounter's bosses and minions (see boss_defs.ENCOUNTERS)
+        self.encounter = boss_type
+        self.hostiles = EntityStore()
+        self.bosses = [] # Every boss of the fight, beaten ones included
+        for kind, name, position, *overrides in get_encounter(boss_type):
+            self.spawn(kind, name, position, *overrides)
+        self.boss = self.bosses[0] # Main boss
 
-        self.bullets = pygame.sprite.Group()
-        self.boss_bullets = pygame.sprite.Group()
+        self.bullets = BulletManager() # Player and boss projectiles
+        self.emitter = PatternEmitter(self.bullets, self.sim_clock.rng) # Boss volleys
         self.ghost_group = pygame.sprite.Group()
         self.game_state = 'PLAYING' # PLAYING, KNOCKOUT, GAMEOVER
         
         # Shooting
         self.shoot_timer = 0
         self.shoot_cooldown = 15 # default frames
-
-        # Background
-        self.background = SpriteLoader.get_background()
+        self.shots_fired = 0
+
+        # Background, with the ground baked in
+        self.background = SpriteLoader.get_background() if screen is not None else None
+        if self.background is not None:
+            self.background = self.background.copy()
+            pygame.draw.rect(self.background, GREEN, (0, SCREEN_HEIGHT - 50, SCREEN_WIDTH, 50))
+        self.renderer = DirtyRenderer()
+        self.render_queue = RenderQueue()
+
+    def spawn(self, kind, name, position, overrides=None):
+        """Add a 'boss' or 'minion' to the fight; returns it."""
+        if kind == 'boss':
+            entity = Boss(*position, name, self.sim_clock)
+            self.bosses.append(entity)
+        else:
+            entity = Minion(*position, name, self.sim_clock, overrides)
+        entity.particles = self.particles
+        return self.hostiles.add(entity)
+
+    def progress(self):
+        # Share of the fight won, averaged over the bosses (for the death screen)
+        return sum(boss.progress() for boss in self.bosses) / len(self.bosses)
+
+    def load_player_data(self, player_data):
+        # Sync persistent data to battle player
+        self.player.coins = player_data['coins']
+        
+        # Calculate HP: Base + 1 for each 'hp' power equipped
+        extra_hp = player_data['equipped_powers'].count('hp')
+        self.player.max_hp = player_data['max_hp_base'] + extra_hp
+        self.player.hp = self.player.max_hp
+        
+        # Only sync EQUIPPED powers to the battle player
+        self.player.powers = player_data['equipped_powers']
 
     def handle_events(self):
         action = None
         for event in pygame.event.get():
+            profiler.handle_event(event)
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
             if event.type == pygame.KEYDOWN:
-                if self.game_state == 'PLAYING':
-                    # Check for shoot
-                    if event.key == pygame.K_x and self.shoot_timer >= self.shoot_cooldown:
-                        self.shoot()
-                        self.shoot_timer = 0
+                if event.key == pygame.K_x:
+                    self.controls.press(event.key) # Fired on the next sim step
                 if event.key == pygame.K_r and (self.game_state in ['GAMEOVER', 'KNOCKOUT']): # R to restart
                     action = 'RESTART'
                 if event.key == pygame.K_m and self.game_state == 'GAMEOVER': # M to Equip
@@ -52,10 +126,16 @@ class Battle:
                 if event.key == pygame.K_ESCAPE: # Back to overworld
                     action = 'OVERWORLD'
         
-        if action:
-            return action
-        keys = pygame.key.get_pressed()
-        if keys[pygame.K_x] and self.game_state == 'PLAYING':
+        return action
+
+    def press_shoot(self):
+        # Check for shoot
+        if self.game_state == 'PLAYING' and self.shoot_timer >= self.shoot_cooldown:
+            self.shoot()
+            self.shoot_timer = 0
+
+    def hold_shoot(self):
+        if self.game_state == 'PLAYING':
             # Adjust cooldown if player has speed power
             cooldown = self.shoot_cooldown
             if 'speed' in self.player.powers:
@@ -64,36 +144,54 @@ class Battle:
             if self.shoot_timer >= cooldown:
                 self.shoot()
                 self.shoot_timer = 0
-                
-        return None
+
+    def step(self):
+        """One fixed simulation step: apply this step's input, then update."""
+        self.player.prev_pos = self.player.rect.topleft
+        self.hostiles.snapshot()
+        self.controls.poll() # One key-state read per step
+        if pygame.K_x in self.controls.consume_pressed():
+            self.press_shoot()
+        if self.controls.held(pygame.K_x):
+            self.hold_shoot()
+        self.update()
 
     def shoot(self):
         direction = self.player.get_shoot_direction()
         scale = 0.7
         if 'wide' in self.player.powers:
             scale = 1.2
-        bullet = Bullet(self.player.rect.centerx, self.player.rect.centery, direction, scale)
-        self.bullets.add(bullet)
-
-    def boss_shoot(self):
-        if self.boss.alive() and self.game_state == 'PLAYING' and self.boss.phase != 'intro':
-            attack_settings = self.boss.get_attack_settings()
-            for b_type, scale, speed, angle in attack_settings:
-                bullet = BossBullet(
-                    self.boss.rect.centerx, 
-                    self.boss.rect.centery, 
-                    self.player.rect.centerx, 
-                    self.player.rect.centery,
-                    bullet_type=b_type,
-                    scale=scale,
-                    speed=speed,
-                    angle_offset=angle
-                )
-                self.boss_bullets.add(bullet)
+        self.bullets.spawn_player_bullet(self.player.rect.centerx, self.player.rect.centery, direction, scale)
+        self.shots_fired += 1
+
+    def boss_shoot(self, entity):
+        if entity.state != 'dying' and self.game_state == 'PLAYING' and entity.can_shoot():
+            with profiler.span('boss_volley'):
+                spawned = 0
+                for volley in entity.get_attack_settings():
+                    spawned += len(self.emitter.emit(
+                        volley,
+                        entity.rect.centerx,
+                        entity.rect.centery,
+                        self.player.rect.centerx,
+                        self.player.rect.centery,
+                        entity
+                    ))
+            profiler.count('volley_bullets', spawned)
 
     def update(self):
+        self.sim_clock.advance_frame()
+        # Roll the broadphase pairs tested/hit counters over to a new frame
+        grid = self.bullets.grid
+        grid.begin_frame()
+        profiler.count('pairs_tested', grid.last_tested)
+        profiler.count('pairs_hit', grid.last_hit)
+        if self.particles is not None:
+            with profiler.span('particles_update'):
+                self.particles.update()
+
         if self.game_state == 'KNOCKOUT':
-            self.boss_group.update()
+            self.hostiles.update()
             return
 
         if self.player.hp <= 0:
@@ -105,76 +203,113 @@ class Battle:
             return
 
         self.shoot_timer += 1
-        self.player_group.update()
-        self.boss_group.update()
-        self.bullets.update()
-        self.boss_bullets.update()
-
-        # Check for boss defeat
-        if self.boss.health <= 0 and self.boss.phase == 'phase2':
+        with profiler.span('player_update'):
+            self.player_group.update()
+        with profiler.span('boss_update'):
+            self.hostiles.update()
+        with profiler.span('bullets_update'):
+            self.bullets.update()
+
+        # Check for defeats: the fight is won once every boss is down
+        for entity in self.hostiles.standing():
+            if entity.defeated():
+                self.hostiles.retire(entity)
+        if all(boss.state == 'dying' for boss in self.bosses):
             self.game_state = 'KNOCKOUT'
-            self.boss.trigger_death()
+            for entity in self.hostiles.standing():
+                self.hostiles.retire(entity)
             return
 
         # Boss shooting logic
-        self.boss.shoot_timer += 1
-        if self.boss.shoot_timer >= self.boss.shoot_cooldown:
-            self.boss_shoot()
-            self.boss.shoot_timer = 0
-
-        # Player Bullets -> Boss
-        hits = pygame.sprite.spritecollide(self.boss, self.bullets, True)
-        if self.boss.alive():
-            for hit in hits:
-                self.boss.take_damage(5)
+        for entity in self.hostiles:
+            entity.shoot_timer += 1
+            if entity.shoot_timer >= entity.shoot_cooldown:
+                self.boss_shoot(entity)
+                entity.shoot_timer = 0
+
+        # Player Bullets -> Bosses and minions
+        with profiler.span('collide_player_bullets'):
+            struck = self.hostiles.collide_bullets(self.bullets, OWNER_PLAYER)
+        for entity, hits in struck:
+            for hit in hits.tolist():
+                entity.take_damage(5, (self.bullets.x[hit], self.bullets.y[hit]))
 
         # Boss Bullets -> Player
-        if pygame.sprite.spritecollide(self.player, self.boss_bullets, True):
+        with profiler.span('collide_boss_bullets'):
+            player_hit = len(self.bullets.collide_sprite(self.player, OWNER_BOSS, True))
+        if player_hit:
             self.player.take_damage()
 
         # Boss Touch -> Player
-        if pygame.sprite.spritecollide(self.player, self.boss_group, False):
+        with profiler.span('collide_boss_touch'):
+            touched = self.hostiles.touching(self.player)
+        if touched:
             self.player.take_damage()
 
-    def draw(self):
+    def enqueue_interpolated(self, layer, group, alpha):
+        # Queue each sprite between its previous and current sim position
+        pairs = []
+        for sprite in group:
+            px, py = sprite.prev_pos
+            x = px + (sprite.rect.x - px) * alpha
+            y = py + (sprite.rect.y - py) * alpha
+            pairs.append((sprite.image, (round(x), round(y))))
+        self.render_queue.add_many(layer, pairs)
+
+    def draw(self, alpha=1.0):
+        # alpha: fraction of a sim step elapsed since the last update
+        renderer = self.renderer
+        # Overlays change the whole screen, so a new game state is a full frame
+        renderer.check_signature(self.game_state)
+
         self.screen.blit(self.background, (0, 0))
-        pygame.draw.rect(self.screen, GREEN, (0, SCREEN_HEIGHT - 50, SCREEN_WIDTH, 50))
-        
-        self.player_group.draw(self.screen)
-        self.boss_group.draw(self.screen)
-        self.bullets.draw(self.screen)
-        self.boss_bullets.draw(self.screen)
-        self.ghost_group.draw(self.screen)
-        
+
+        # Sprites go through the render queue: one batched call per layer
+        queue = self.render_queue
+        self.enqueue_interpolated(LAYER_PLAYER, self.player_group, alpha)
+        self.enqueue_interpolated(LAYER_HOSTILES, self.hostiles, alpha)
+        self.bullets.enqueue(queue, LAYER_PLAYER_SHOTS, LAYER_BOSS_SHOTS, alpha=alpha)
+        self.particles.enqueue(queue, LAYER_EFFECTS, alpha=alpha)
+        queue.add_many(LAYER_GHOSTS, [(ghost.image, ghost.rect) for ghost in self.ghost_group])
         if self.game_state == 'PLAYING':
-            self.draw_player_hp()
-        
+            queue.add_many(LAYER_HUD, self.player_hp_blits())
+        renderer.mark_many(queue.flush(self.screen, doreturn=renderer.enabled))
+
         if self.game_state == 'KNOCKOUT':
-            font = pygame.font.SysFont('Arial', 100, bold=True)
-            win_text = font.render("KNOCKOUT!", True, RED)
+            font = ('Arial', 100, True)
+            win_text = text_cache.render(font, "KNOCKOUT!", RED)
             self.screen.blit(win_text, (SCREEN_WIDTH//2 - win_text.get_width()//2, SCREEN_HEIGHT//2 - 50))
-            font_small = pygame.font.SysFont('Arial', 36)
-            restart_text = font_small.render("Press R to return to Map", True, BLACK)
+            font_small = ('Arial', 36, False)
+            restart_text = text_cache.render(font_small, "Press R to return to Map", BLACK)
             self.screen.blit(restart_text, (SCREEN_WIDTH//2 - restart_text.get_width()//2, SCREEN_HEIGHT//2 + 50))
         
         if self.game_state == 'GAMEOVER':
             self.draw_death_screen()
 
-        pygame.display.flip()
+        if profiler.enabled:
+            profiler.count('player_bullets', len(self.bullets.live_indices(OWNER_PLAYER)))
+            profiler.count('boss_bullets', len(self.bullets.live_indices(OWNER_BOSS)))
+            profiler.count('hostiles', len(self.hostiles))
+            profiler.count('particles', self.particles.count)
+            profiler.count('particles_recycled', self.particles.recycled)
+            profiler.count('sprites', len(self.player_group) + len(self.hostiles) + len(self.ghost_group))
+            profiler.count('draw_calls', queue.last_calls)
+            profiler.count('blits', queue.last_blits)
+            renderer.mark(profiler.draw_overlay(self.screen))
+
+        with profiler.span('present'):
+            renderer.present()
 
     def draw_death_screen(self):
         overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
         overlay.fill((0, 0, 0, 180))
         self.screen.blit(overlay, (0, 0))
-        font_big = pygame.font.SysFont('Arial', 100, bold=True)
-        died_text = font_big.render("YOU DIED", True, RED)
+        font_big = ('Arial', 100, True)
+        died_text = text_cache.render(font_big, "YOU DIED", RED)
         self.screen.blit(died_text, (SCREEN_WIDTH//2 - died_text.get_width()//2, 100))
         
         # Progress bar logic
-        phase_map = {'intro': 0, 'phase1': 1, 'phase2': 2}
-        base_progress = phase_map.get(self.boss.phase, 0) / 3.0
-        phase_percent = (100 - self.boss.health) / 100.0 / 3.0
-        total_progress = base_progress + phase_percent
+        total_progress = self.progress()
 
         bar_w, bar_h = 600, 40
         bar_x = (SCREEN_WIDTH - bar_w) // 2
@@ -184,78 +319,102 @@ class Battle:
         pygame.draw.rect(self.screen, WHITE, (bar_x, bar_y, bar_w, bar_h), 4)
 
         # Markers & Labels
-        font_small = pygame.font.SysFont('Arial', 24, bold=True)
+        font_small = ('Arial', 24, True)
         markers = [("Intro", 0), ("Phase 1", 1/3), ("Phase 2", 2/3), ("Finish", 1.0)]
         for label, pos in markers:
             mx = bar_x + int(bar_w * pos)
             pygame.draw.line(self.screen, WHITE, (mx, bar_y), (mx, bar_y + bar_h), 2)
-            lbl = font_small.render(label, True, WHITE)
+            lbl = text_cache.render(font_small, label, WHITE)
             self.screen.blit(lbl, (mx - lbl.get_width()//2, bar_y + bar_h + 10))
 
         # Progress Indicator (Yellow Circle)
         indicator_x = bar_x + int(bar_w * total_progress)
         pygame.draw.circle(self.screen, (255, 255, 0), (indicator_x, bar_y + bar_h//2), 15)
 
-        restart_font = pygame.font.SysFont('Arial', 36)
-        restart_text = restart_font.render("Press R to return to Map | M to Equip", True, WHITE)
+        restart_font = ('Arial', 36, False)
+        restart_text = text_cache.render(restart_font, "Press R to return to Map | M to Equip", WHITE)
         self.screen.blit(restart_text, (SCREEN_WIDTH//2 - restart_text.get_width()//2, SCREEN_HEIGHT - 100))
 
-    def draw_player_hp(self):
-        font = pygame.font.SysFont('Arial', 32, bold=True)
+    def player_hp_blits(self):
+        font = ('Arial', 32, True)
         hp_text = f"HP. {max(0, self.player.hp)}"
         color = YELLOW if self.player.hp > 1 else RED
-        shadow = font.render(hp_text, True, BLACK)
-        text = font.render(hp_text, True, color)
-        self.screen.blit(shadow, (22, SCREEN_HEIGHT - 48))
-        self.screen.blit(text, (20, SCREEN_HEIGHT - 50))
+        shadow = text_cache.render(font, hp_text, BLACK)
+        text = text_cache.render(font, hp_text, color)
+        return [(shadow, (22, SCREEN_HEIGHT - 48)), (text, (20, SCREEN_HEIGHT - 50))]
 
 class Game:
-    def __init__(self):
+    def __init__(self, collision_mode=COLLISION_MODE):
+        set_collision_mode(collision_mode)
         pygame.init()
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("Cuphead Kenney Edition")
+        fonts.preload() # Resolve every UI font once, up front
         self.clock = pygame.time.Clock()
         
         # Persistent Global State
-        self.global_player_data = {
-            'coins': 10,
-            'max_hp_base': 3,
-            'powers': [], # Owned powers
-            'equipped_powers': [], # Active powers
-            'defeated_bosses': [], # List of boss names/types defeated
-            'has_key': False, # Golden key to Island 2
-            'is_portal_unlocked': False, # Whether the door is open
-            'current_island': 1 # Track which island we're on
-        }
+        self.global_player_data = new_player_data()
         
         self.state = 'OVERWORLD'
-        self.overworld = Island1(
+        # Islands are built once and kept; progress is applied incrementally
+        self.island1 = Island1(
             self.screen, 
             self.global_player_data['defeated_bosses'],
             self.global_player_data['has_key'],
             self.global_player_data['is_portal_unlocked']
         )
+        self.island2 = None
+        self.overworld = self.island1
+        self.transition_ms = 0.0 # time taken by the last switch back to an island
         self.battle = None
+        self.recorder = None
         self.shop = None
         self.menu = None
 
+    def start_battle(self, boss_type):
+        # Whatever the prefetcher has not finished is loaded synchronously here
+        prefetcher.finish(boss_type)
+        controls = KeyboardControls()
+        if RECORD_BATTLES:
+            self.recorder = InputRecorder(controls)
+            controls = self.recorder.controls
+        self.battle = Battle(self.screen, boss_type, controls)
+        self.battle.load_player_data(self.global_player_data)
+        if self.recorder:
+            self.recorder.start(self.battle, self.global_player_data)
+
+    def show_island(self):
+        """Switch to the current island's scene, brought up to date with progress."""
+        start = time.perf_counter()
+        if self.global_player_data['current_island'] == 1:
+            self.overworld = self.island1
+        else:
+            if self.island2 is None:
+                self.island2 = Island2(self.screen, self.global_player_data['defeated_bosses'])
+            self.overworld = self.island2
+        self.overworld.apply_progress(self.global_player_data)
+        self.transition_ms = (time.perf_counter() - start) * 1000
+        profiler.count('transition_us', int(self.transition_ms * 1000))
+
+    def end_battle(self):
+        # Keep the finished fight's inputs so it can be replayed exactly
+        if self.recorder:
+            self.recorder.save(REPLAY_PATH, self.battle)
+            self.recorder = None
+        self.battle = None
+
     def run(self):
         while True:
+            profiler.begin_frame()
             if self.state == 'OVERWORLD':
                 events = pygame.event.get()
-                node_type, node_name = self.overworld.run(events)
+                with profiler.span('overworld'):
+                    node_type, node_name = self.overworld.run(events)
+                with profiler.span('prefetch'):
+                    prefetcher.pump()
                 if node_type == 'BATTLE':
-                    self.battle = Battle(self.screen, node_name)
-                    # Sync persistent data to battle player
-                    self.battle.player.coins = self.global_player_data['coins']
-                    
-                    # Calculate HP: Base + 1 for each 'hp' power equipped
-                    extra_hp = self.global_player_data['equipped_powers'].count('hp')
-                    self.battle.player.max_hp = self.global_player_data['max_hp_base'] + extra_hp
-                    self.battle.player.hp = self.battle.player.max_hp
-                    
-                    # Only sync EQUIPPED powers to the battle player
-                    self.battle.player.powers = self.global_player_data['equipped_powers']
+                    with profiler.span('battle_entry'):
+                        self.start_battle(node_name)
                     self.state = 'BATTLE'
                 elif node_type == 'PORTAL':
                     if self.global_player_data['has_key']:
@@ -263,17 +422,12 @@ class Game:
                             # Step 1: Unlock
                             self.global_player_data['is_portal_unlocked'] = True
                             # Refresh overworld to show open door
-                            self.overworld = Island1(
-                                self.screen, 
-                                self.global_player_data['defeated_bosses'],
-                                self.global_player_data['has_key'],
-                                self.global_player_data['is_portal_unlocked']
-                            )
+                            self.show_island()
                         else:
                             # Step 2: Enter
                             self.global_player_data['current_island'] = 2
                             self.state = 'ISLAND2'
-                            self.overworld = Island2(self.screen, self.global_player_data['defeated_bosses'])
+                            self.show_island()
                 elif node_type == 'SHOP':
                     from shop import Shop
                     self.shop = Shop(self.screen)
@@ -283,6 +437,7 @@ class Game:
                 
                 # Overworld event loop
                 for event in events:
+                    profiler.handle_event(event)
                     if event.type == pygame.QUIT:
                         pygame.quit()
                         sys.exit()
@@ -295,38 +450,36 @@ class Game:
                 pygame.display.flip()
 
             elif self.state == 'BATTLE':
-                action = self.battle.handle_events()
+                with profiler.span('handle_events'):
+                    action = self.battle.handle_events()
                 if action == 'RESTART' or action == 'OVERWORLD':
                     if self.battle.game_state == 'KNOCKOUT':
                         self.global_player_data['coins'] += 5
                         # Record boss as defeated
-                        if self.battle.boss.boss_type not in self.global_player_data['defeated_bosses']:
-                            self.global_player_data['defeated_bosses'].append(self.battle.boss.boss_type)
+                        if self.battle.encounter not in self.global_player_data['defeated_bosses']:
+                            self.global_player_data['defeated_bosses'].append(self.battle.encounter)
                         
                         # Check for all bosses defeated to award key
                         if len(self.global_player_data['defeated_bosses']) == 3:
                             self.global_player_data['has_key'] = True
                     
                     self.state = 'OVERWORLD'
-                    # Re-instantiate overworld to reflect changes (flag colors & portal)
-                    if self.global_player_data['current_island'] == 1:
-                        self.overworld = Island1(
-                            self.screen, 
-                            self.global_player_data['defeated_bosses'],
-                            self.global_player_data['has_key'],
-                            self.global_player_data['is_portal_unlocked']
-                        )
-                    else:
-                        self.overworld = Island2(self.screen, self.global_player_data['defeated_bosses'])
-                    self.battle = None 
+                    # Update the kept overworld to reflect changes (flag colors & portal)
+                    self.show_island()
+                    self.end_battle()
                 elif action == 'MENU':
                     from menu import Menu
                     self.menu = Menu(self.screen, self.global_player_data)
                     self.state = 'MENU'
-                    self.battle = None # Clear battle since we're switching
+                    self.end_battle() # Clear battle since we're switching
                 else:
-                    self.battle.update()
-                    self.battle.draw()
+                    # Fixed-step simulation, rendered at the display rate
+                    steps = self.battle.sim_clock.add_time(self.clock.get_time() / 1000)
+                    for _ in range(steps):
+                        with profiler.span('step'):
+                            self.battle.step()
+                    with profiler.span('draw'):
+                        self.battle.draw(self.battle.sim_clock.alpha())
 
             elif self.state == 'SHOP':
                 action = self.shop.handle_events()
@@ -340,7 +493,8 @@ class Game:
                     self.state = 'OVERWORLD'
                     self.shop = None
                 else:
-                    self.shop.draw()
+                    with profiler.span('draw'):
+                        self.shop.draw()
 
             elif self.state == 'MENU':
                 action = self.menu.handle_events()
@@ -348,13 +502,15 @@ class Game:
                     self.state = 'OVERWORLD'
                     self.menu = None
                 else:
-                    self.menu.draw()
+                    with profiler.span('draw'):
+                        self.menu.draw()
 
             elif self.state == 'ISLAND2':
                 events = pygame.event.get()
                 action = self.overworld.run(events) # It can return 'OVERWORLD' or node interactions
                 
                 for event in events:
+                    profiler.handle_event(event)
                     if event.type == pygame.QUIT:
                         pygame.quit()
                         sys.exit()
@@ -362,29 +518,30 @@ class Game:
                         if event.key == pygame.K_r: # R to return to World Map 1
                             self.global_player_data['current_island'] = 1
                             self.state = 'OVERWORLD'
-                            self.overworld = Island1(
-                                self.screen, 
-                                self.global_player_data['defeated_bosses'],
-                                self.global_player_data['has_key'],
-                                self.global_player_data['is_portal_unlocked']
-                            )
+                            self.show_island()
 
-            self.clock.tick(FPS)
+            profiler.end_frame()
+            self.clock.tick(RENDER_FPS if self.state == 'BATTLE' else FPS)
 
     def draw_island2_screen(self):
         self.screen.fill((30, 30, 60)) # Deep blue
-        font_big = pygame.font.SysFont('Arial', 80, bold=True)
-        island_text = font_big.render("WELCOME TO ISLAND 2!", True, YELLOW)
+        font_big = ('Arial', 80, True)
+        island_text = text_cache.render(font_big, "WELCOME TO ISLAND 2!", YELLOW)
         self.screen.blit(island_text, (SCREEN_WIDTH//2 - island_text.get_width()//2, 200))
         
-        font_small = pygame.font.SysFont('Arial', 32)
-        info_text = font_small.render("More bosses and challenges await...", True, WHITE)
+        font_small = ('Arial', 32, False)
+        info_text = text_cache.render(font_small, "More bosses and challenges await...", WHITE)
         self.screen.blit(info_text, (SCREEN_WIDTH//2 - info_text.get_width()//2, 350))
         
-        hint_text = font_small.render("Press R to return to Map", True, WHITE)
+        hint_text = text_cache.render(font_small, "Press R to return to Map", WHITE)
         self.screen.blit(hint_text, (SCREEN_WIDTH//2 - hint_text.get_width()//2, SCREEN_HEIGHT - 100))
         pygame.display.flip()
 
 if __name__ == "__main__":
-    game = Game()
+    import argparse
+    parser = argparse.ArgumentParser(description="Cuphead Kenney Edition")
+    parser.add_argument('--collision', choices=COLLISION_MODES, default=COLLISION_MODE,
+                        help=f"collision mode (default: {COLLISION_MODE})")
+    args = parser.parse_args()
+    game = Game(args.collision)
     game.run()
@@ -1,13 +1,17 @@
 import pygame
 import sys
 from settings import *
+from fonts import text_cache
+from render import DirtyRenderer
+from profiler import profiler
 
 class Menu:
     def __init__(self, screen, player_data):
         self.screen = screen
-        self.font_title = pygame.font.SysFont('Arial', 64, bold=True)
-        self.font_item = pygame.font.SysFont('Arial', 32, bold=True)
-        self.font_desc = pygame.font.SysFont('Arial', 20)
+        # Font keys into the shared font registry / text cache
+        self.font_title = ('Arial', 64, True)
+        self.font_item = ('Arial', 32, True)
+        self.font_desc = ('Arial', 20, False)
         
         self.player_data = player_data # Reference to global_player_data
         
@@ -22,12 +26,14 @@ class Menu:
         # Only list powers the player owns
         self.owned_power_ids = player_data['powers']
         self.selected_index = 0
+        self.renderer = DirtyRenderer()
         
         self.bg_color = (30, 40, 50) # Dark blueish gray
 
     def handle_events(self):
         action = None
         for event in pygame.event.get():
+            profiler.handle_event(event)
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
@@ -56,14 +62,16 @@ class Menu:
             print(f"Equipped {power_id}")
 
     def draw(self):
+        # The screen is static until the selection or inventory changes
+        self.renderer.check_signature((self.selected_index, tuple(self.player_data['equipped_powers']), len(self.owned_power_ids)))
         self.screen.fill(self.bg_color)
         
         # Title
-        title_surf = self.font_title.render("EQUIPMENT", True, PINK)
+        title_surf = text_cache.render(self.font_title, "EQUIPMENT", PINK)
         self.screen.blit(title_surf, (SCREEN_WIDTH//2 - title_surf.get_width()//2, 50))
         
         if not self.owned_power_ids:
-            empty_surf = self.font_item.render("Inventory is Empty! Go to the shop.", True, WHITE)
+            empty_surf = text_cache.render(self.font_item, "Inventory is Empty! Go to the shop.", WHITE)
             self.screen.blit(empty_surf, (SCREEN_WIDTH//2 - empty_surf.get_width()//2, SCREEN_HEIGHT//2))
         else:
             # Items list
@@ -82,19 +90,19 @@ class Menu:
                 p_def = self.power_defs.get(power_id, {'name': power_id, 'desc': ''})
                 
                 # Name
-                name_surf = self.font_item.render(p_def['name'], True, color)
+                name_surf = text_cache.render(self.font_item, p_def['name'], color)
                 self.screen.blit(name_surf, (150, start_y + i*100))
                 
                 # Description
-                desc_surf = self.font_desc.render(p_def['desc'], True, WHITE)
+                desc_surf = text_cache.render(self.font_desc, p_def['desc'], WHITE)
                 self.screen.blit(desc_surf, (150, start_y + i*100 + 40))
                 
                 # Status
-                stat_surf = self.font_item.render(status_text, True, status_color)
+                stat_surf = text_cache.render(self.font_item, status_text, status_color)
                 self.screen.blit(stat_surf, (SCREEN_WIDTH - 350, start_y + i*100 + 10))
 
         # Instructions
-        instr_surf = self.font_desc.render("Arrows to Select | X to Equip/Unequip | M to Close", True, WHITE)
+        instr_surf = text_cache.render(self.font_desc, "Arrows to Select | X to Equip/Unequip | M to Close", WHITE)
         self.screen.blit(instr_surf, (SCREEN_WIDTH//2 - instr_surf.get_width()//2, SCREEN_HEIGHT - 50))
 
-        pygame.display.flip()
+        self.renderer.present()
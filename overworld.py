@@ -1,10 +1,23 @@
 import pygame
 from settings import *
+from fonts import text_cache
 from sprite_loader import SpriteLoader
+from controls import KeyboardControls
+from prefetch import prefetcher
+from render import RenderQueue
+
+def tile_blits(tile):
+    # (tile, position) pairs covering the whole screen
+    w, h = tile.get_size()
+    return [(tile, (x, y)) for x in range(0, SCREEN_WIDTH, w) for y in range(0, SCREEN_HEIGHT, h)]
+
+def sprite_blits(group):
+    return [(sprite.image, sprite.rect) for sprite in group]
 
 class OverworldPlayer(pygame.sprite.Sprite):
-    def __init__(self, pos):
+    def __init__(self, pos, controls=None):
         super().__init__()
+        self.controls = controls if controls is not None else KeyboardControls()
         # Load and scale player sprites specifically for the overworld
         original_sprites = SpriteLoader.get_player_sprites()
         self.sprites = {}
@@ -19,17 +32,18 @@ class OverworldPlayer(pygame.sprite.Sprite):
         self.speed = 5
 
     def get_input(self):
-        keys = pygame.key.get_pressed()
-        if keys[pygame.K_RIGHT]:
+        keys = self.controls
+        keys.poll()
+        if keys.held(pygame.K_RIGHT):
             self.direction.x = 1
-        elif keys[pygame.K_LEFT]:
+        elif keys.held(pygame.K_LEFT):
             self.direction.x = -1
         else:
             self.direction.x = 0
 
-        if keys[pygame.K_UP]:
+        if keys.held(pygame.K_UP):
             self.direction.y = -1
-        elif keys[pygame.K_DOWN]:
+        elif keys.held(pygame.K_DOWN):
             self.direction.y = 1
         else:
             self.direction.y = 0
@@ -65,18 +79,114 @@ class OverworldObstacle(pygame.sprite.Sprite):
 class OverworldNode(pygame.sprite.Sprite):
     def __init__(self, pos, name, type='BATTLE', is_completed=False, has_key=False, is_portal_unlocked=False):
         super().__init__()
-        if type == 'BATTLE':
+        self.name = name
+        self.type = type
+        self.image_path = None
+        self.set_state(is_completed, has_key, is_portal_unlocked)
+        self.rect = self.image.get_rect(center=pos)
+
+    def set_state(self, is_completed=False, has_key=False, is_portal_unlocked=False):
+        """Pick the flag/door image for this progress; returns True if it changed."""
+        if self.type == 'BATTLE':
             flag_color = 'green' if is_completed else 'red'
-            self.image = SpriteLoader.load_image(f"{ASSET_DIR}/Sprites/Tiles/Double/flag_{flag_color}_a.png", 0.3)
-        elif type == 'PORTAL':
+            path, scale = f"{ASSET_DIR}/Sprites/Tiles/Double/flag_{flag_color}_a.png", 0.3
+        elif self.type == 'PORTAL':
             # Portal state: only open if BOTH has_key and is_portal_unlocked are True
             door_state = 'open' if (has_key and is_portal_unlocked) else 'closed'
-            self.image = SpriteLoader.load_image(f"{ASSET_DIR}/Sprites/Tiles/Double/door_{door_state}_top.png", 0.5)
+            path, scale = f"{ASSET_DIR}/Sprites/Tiles/Double/door_{door_state}_top.png", 0.5
         else: # Shop
-            self.image = SpriteLoader.load_image(f"{ASSET_DIR}/Sprites/Tiles/Double/door_closed_top.png", 0.5)
-        self.rect = self.image.get_rect(center=pos)
-        self.name = name
-        self.type = type
+            path, scale = f"{ASSET_DIR}/Sprites/Tiles/Double/door_closed_top.png", 0.5
+        if path == self.image_path:
+            return False
+        self.image_path = path
+        self.image = SpriteLoader.load_image(path, scale)
+        return True
+
+class TileGrid:
+    """Walkability grid built from a map's obstacle and node sprites.
+
+    Each cell holds a byte naming the solid box of the obstacle filed there
+    (0 = walkable), so a collision query only looks at the handful of cells
+    under the player rect instead of every obstacle sprite.
+    """
+    def __init__(self, rows, cols, tile_size):
+        self.rows = rows
+        self.cols = cols
+        self.tile_size = tile_size
+        self.solid = bytearray(rows * cols)
+        self.kinds = [None] # code -> (dx, dy, w, h) relative to the cell corner
+        self.kind_codes = {}
+        self.nodes = {} # (col, row) -> nodes whose rect touches that cell
+        self.reach = 0 # how many cells an obstacle can overflow to the right/bottom
+
+    @classmethod
+    def from_groups(cls, rows, cols, tile_size, obstacle_group, node_group):
+        grid = cls(rows, cols, tile_size)
+        for obstacle in obstacle_group:
+            grid.add_solid(obstacle.rect)
+        for node in node_group:
+            grid.add_node(node)
+        return grid
+
+    def add_solid(self, rect):
+        col = rect.left // self.tile_size
+        row = rect.top // self.tile_size
+        box = (rect.left - col * self.tile_size, rect.top - row * self.tile_size, rect.width, rect.height)
+        code = self.kind_codes.get(box)
+        if code is None:
+            code = len(self.kinds)
+            self.kinds.append(box)
+            self.kind_codes[box] = code
+        self.solid[row * self.cols + col] = code
+        overflow = max(box[0] + box[2], box[1] + box[3]) - 1
+        self.reach = max(self.reach, overflow // self.tile_size)
+
+    def add_node(self, node):
+        for cell in self.cells(node.rect):
+            self.nodes.setdefault(cell, []).append(node)
+
+    def cells(self, rect, reach=0):
+        ts = self.tile_size
+        col0 = max(0, rect.left // ts - reach)
+        row0 = max(0, rect.top // ts - reach)
+        col1 = min(self.cols - 1, (rect.right - 1) // ts)
+        row1 = min(self.rows - 1, (rect.bottom - 1) // ts)
+        for row in range(row0, row1 + 1):
+            for col in range(col0, col1 + 1):
+                yield col, row
+
+    def blocked(self, rect):
+        ts = self.tile_size
+        for col, row in self.cells(rect, self.reach):
+            code = self.solid[row * self.cols + col]
+            if code:
+                dx, dy, w, h = self.kinds[code]
+                if rect.colliderect((col * ts + dx, row * ts + dy, w, h)):
+                    return True
+        return False
+
+    def node_at(self, rect):
+        for cell in self.cells(rect):
+            for node in self.nodes.get(cell, ()):
+                if rect.colliderect(node.rect):
+                    return node
+        return None
+
+    def move(self, player, old_pos):
+        """Resolve the player's last step one axis at a time so walls can be slid along."""
+        new_pos = player.pos.copy()
+        player.pos.update(new_pos.x, old_pos.y)
+        player.rect.center = player.pos
+        if self.blocked(player.rect):
+            player.pos.x = old_pos.x
+        player.pos.y = new_pos.y
+        player.rect.center = player.pos
+        if self.blocked(player.rect):
+            player.pos.y = old_pos.y
+        player.rect.center = player.pos
+
+# Screen area of Island1's key HUD, repainted when the key is picked up
+KEY_HUD_RECT = pygame.Rect(SCREEN_WIDTH // 2, 0, SCREEN_WIDTH // 2, 80)
 
 class Island1:
     def __init__(self, screen, defeated_bosses=None, has_key=False, is_portal_unlocked=False):
@@ -103,6 +213,10 @@ class Island1:
         self.path_group = pygame.sprite.Group()
         self.node_group = pygame.sprite.Group()
         
+        # Prerendered terrain/obstacles/labels, built on first draw
+        self.static_layer = None
+        self.static_layer_key = None
+
         self.create_map()
 
     def create_map(self):
@@ -159,14 +273,15 @@ class Island1:
                         is_portal_unlocked=self.is_portal_unlocked
                     ))
 
+        self.grid = TileGrid.from_groups(len(map_data), len(map_data[0]), self.tile_size, self.obstacle_group, self.node_group)
+
     def run(self, events):
         self.update()
         self.draw()
         
         # Check for encounter
-        hits = pygame.sprite.spritecollide(self.player, self.node_group, False)
-        if hits:
-            node = hits[0]
+        node = self.grid.node_at(self.player.rect)
+        if node:
             for event in events:
                 if event.type == pygame.KEYDOWN and event.key == pygame.K_x:
                     # Move player away slightly
@@ -175,35 +290,90 @@ class Island1:
         return ('OVERWORLD', None)
 
     def update(self):
-        # Collision handling for the player
+        # Collision handling for the player (per axis, against the tile grid)
         old_pos = self.player.pos.copy()
         self.player_group.update()
-        
-        # Player is slowed down slightly if NOT on a path? Or just regular collisions
-        if pygame.sprite.spritecollide(self.player, self.obstacle_group, False):
-            self.player.pos = old_pos
-            self.player.rect.center = self.player.pos
+        self.grid.move(self.player, old_pos)
+        self.prefetch_nearby()
 
-    def draw(self):
-        # Fill background with grass
-        for x in range(0, SCREEN_WIDTH, self.grass_tile.get_width()):
-            for y in range(0, SCREEN_HEIGHT, self.grass_tile.get_height()):
-                self.screen.blit(self.grass_tile, (x, y))
-        
-        self.path_group.draw(self.screen)
-        self.obstacle_group.draw(self.screen)
-        self.node_group.draw(self.screen)
-        self.player_group.draw(self.screen)
-        
-        font = pygame.font.SysFont('Arial', 24, bold=True)
-        text = font.render("Use Arrow Keys to move. Press X on Node to interact!", True, BLACK)
-        self.screen.blit(text, (20, 20))
+    def prefetch_nearby(self):
+        # Start loading a fight's assets as soon as the player heads for its node
+        for node in self.node_group:
+            if node.type == 'BATTLE' and self.player.pos.distance_to(node.rect.center) < PREFETCH_RADIUS:
+                prefetcher.request(node.name)
+
+    def apply_progress(self, player_data):
+        """Bring flags, the portal door and the key HUD up to date with player_data.
+
+        Only nodes whose image actually changes are swapped, and only their
+        part of the static layer is repainted; the map and the player's
+        position are kept.
+        """
+        self.defeated_bosses = player_data['defeated_bosses']
+        key_changed = self.has_key != player_data['has_key']
+        self.has_key = player_data['has_key']
+        self.is_portal_unlocked = player_data['is_portal_unlocked']
+
+        dirty = [KEY_HUD_RECT] if key_changed else []
+        for node in self.node_group:
+            if node.set_state(node.name in self.defeated_bosses, self.has_key, self.is_portal_unlocked):
+                dirty.append(node.rect.union(node.image.get_rect(topleft=node.rect.topleft)))
+
+        if self.static_layer is not None:
+            for rect in dirty:
+                self.paint_static_layer(self.static_layer, rect)
+            self.static_layer_key = self.static_key()
+
+    def static_key(self):
+        # Everything baked into the static layer depends only on this state
+        return (tuple(self.defeated_bosses), self.has_key, self.is_portal_unlocked)
+
+    def bake_static_layer(self):
+        layer = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+        self.paint_static_layer(layer)
+        self.static_layer = layer
+        self.static_layer_key = self.static_key()
+
+    def paint_static_layer(self, layer, area=None):
+        # With an area, every blit is clipped to it (an incremental repaint)
+        layer.set_clip(area)
+
+        # Grass, terrain, nodes, then text: one batched blit per layer
+        queue = RenderQueue()
+        queue.add_many(0, tile_blits(self.grass_tile))
+        queue.add_many(1, sprite_blits(self.path_group))
+        queue.add_many(2, sprite_blits(self.obstacle_group))
+        queue.add_many(3, sprite_blits(self.node_group))
+
+        font = ('Arial', 24, True)
+        text = text_cache.render(font, "Use Arrow Keys to move. Press X on Node to interact!", BLACK)
+        queue.add(4, text, (20, 20))
 
         # HUD for Key
         if self.has_key:
-            self.screen.blit(self.key_image, (SCREEN_WIDTH - 80, 20))
-            key_text = font.render("Golden Key", True, YELLOW)
-            self.screen.blit(key_text, (SCREEN_WIDTH - key_text.get_width() - 85, 25))
+            queue.add(4, self.key_image, (SCREEN_WIDTH - 80, 20))
+            key_text = text_cache.render(font, "Golden Key", YELLOW)
+            queue.add(4, key_text, (SCREEN_WIDTH - key_text.get_width() - 85, 25))
+        queue.flush(layer)
+        layer.set_clip(None)
+
+    def draw(self):
+        # Terrain, nodes and labels only change with node state, so they are
+        # baked once and re-baked when that state changes
+        if self.static_layer is None or self.static_layer_key != self.static_key():
+            self.bake_static_layer()
+        self.screen.blit(self.static_layer, (0, 0))
+        self.draw_loading_bars()
+        self.player_group.draw(self.screen)
+
+    def draw_loading_bars(self):
+        # Thin bar under each boss node whose battle is still being prefetched
+        for node in self.node_group:
+            if node.type == 'BATTLE' and node.name in prefetcher.jobs and not prefetcher.ready(node.name):
+                bar = pygame.Rect(node.rect.left, node.rect.bottom + 4, node.rect.width, 6)
+                pygame.draw.rect(self.screen, BLACK, bar)
+                bar.width = int(bar.width * prefetcher.progress(node.name))
+                pygame.draw.rect(self.screen, YELLOW, bar)
 
 class Island2:
     def __init__(self, screen, defeated_bosses=None):
@@ -225,6 +395,9 @@ class Island2:
         self.path_group = pygame.sprite.Group()
         self.node_group = pygame.sprite.Group()
         
+        # Prerendered terrain/obstacles/labels, built on first draw
+        self.static_layer = None
+
         self.create_map()
 
     def create_map(self):
@@ -257,30 +430,40 @@ class Island2:
                 elif tile == 'P':
                     self.path_group.add(OverworldObstacle((x, y), self.path_tile)) 
 
+        self.grid = TileGrid.from_groups(len(map_data), len(map_data[0]), self.tile_size, self.obstacle_group, self.node_group)
+
     def run(self, events):
         self.update()
         self.draw()
         return ('OVERWORLD', None)
 
+    def apply_progress(self, player_data):
+        # No progress-dependent nodes on Island 2 yet
+        self.defeated_bosses = player_data['defeated_bosses']
+
     def update(self):
         old_pos = self.player.pos.copy()
         self.player_group.update()
-        if pygame.sprite.spritecollide(self.player, self.obstacle_group, False):
-            self.player.pos = old_pos
-            self.player.rect.center = self.player.pos
+        self.grid.move(self.player, old_pos)
+
+    def bake_static_layer(self):
+        layer = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+        queue = RenderQueue()
+        queue.add_many(0, tile_blits(self.grass_tile))
+        queue.add_many(1, sprite_blits(self.path_group))
+        queue.add_many(2, sprite_blits(self.obstacle_group))
+
+        font = ('Arial', 24, True)
+        text = text_cache.render(font, "WELCOME TO ISLAND 2! (More bosses coming soon)", YELLOW)
+        queue.add(3, text, (SCREEN_WIDTH//2 - text.get_width()//2, 50))
+
+        hint = text_cache.render(font, "Press R to return to World Map", WHITE)
+        queue.add(3, hint, (20, SCREEN_HEIGHT - 40))
+        queue.flush(layer)
+        self.static_layer = layer
 
     def draw(self):
-        for x in range(0, SCREEN_WIDTH, self.grass_tile.get_width()):
-            for y in range(0, SCREEN_HEIGHT, self.grass_tile.get_height()):
-                self.screen.blit(self.grass_tile, (x, y))
-        
-        self.path_group.draw(self.screen)
-        self.obstacle_group.draw(self.screen)
+        if self.static_layer is None:
+            self.bake_static_layer()
+        self.screen.blit(self.static_layer, (0, 0))
         self.player_group.draw(self.screen)
-        
-        font = pygame.font.SysFont('Arial', 24, bold=True)
-        text = font.render("WELCOME TO ISLAND 2! (More bosses coming soon)", True, YELLOW)
-        self.screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, 50))
-        
-        hint = font.render("Press R to return to World Map", True, WHITE)
-        self.screen.blit(hint, (20, SCREEN_HEIGHT - 40))
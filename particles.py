@@ -0,0 +1,148 @@
+import numpy as np
+import pygame
+from settings import *
+from sprite_loader import convert_surface
+
+# name -> color, radius, end/start size ratio, lifetime range (frames),
+#         speed range (px/frame), gravity, drag (velocity kept per frame)
+PARTICLE_STYLES = {
+    'spark': ((255, 220, 90), 3, 0.5, (10, 22), (3, 9), 0.35, 0.92),   # Boss hit
+    'smoke': ((225, 225, 225), 6, 2.0, (18, 34), (0.5, 2), -0.05, 0.88),  # Dash
+    'burst': ((255, 130, 40), 6, 0.4, (30, 60), (4, 14), 0.25, 0.95),  # Death
+}
+
+class ParticleSystem:
+    """Cosmetic particles in packed NumPy columns, updated and drawn in bulk.
+
+    Live particles occupy [0, count) of every column; dead ones are
+    compacted away once per update. Each style is drawn from
+    PARTICLE_FADE_STEPS frames that already carry its tint and fade, so
+    enqueue() hands a RenderQueue plain blits with no per-particle
+    set_alpha. At most
+    `budget` particles live at once: a burst that doesn't fit recycles the
+    particles closest to expiring (the most faded ones) first.
+
+    Randomness comes from the system's own generator, never the fight's,
+    so effects don't change a simulation or its replay.
+    """
+    def __init__(self, budget=PARTICLE_BUDGET, seed=0):
+        self.budget = budget
+        self.count = 0
+        self.x = np.zeros(budget, dtype=np.float64)
+        self.y = np.zeros(budget, dtype=np.float64)
+        self.px = np.zeros(budget, dtype=np.float64) # Position before the last update
+        self.py = np.zeros(budget, dtype=np.float64)
+        self.vx = np.zeros(budget, dtype=np.float64)
+        self.vy = np.zeros(budget, dtype=np.float64)
+        self.life = np.zeros(budget, dtype=np.float64) # Frames left
+        self.max_life = np.ones(budget, dtype=np.float64)
+        self.style = np.zeros(budget, dtype=np.int16)
+        self.rng = np.random.default_rng(seed)
+        self.recycled = 0 # Particles cut short to stay within budget
+
+        self.style_ids = {name: i for i, name in enumerate(PARTICLE_STYLES)}
+        styles = PARTICLE_STYLES.values()
+        self.gravity = np.array([style[5] for style in styles])
+        self.drag = np.array([style[6] for style in styles])
+        self.frames = None # Built on first enqueue, once a display exists
+
+    def build_frames(self):
+        # Frame style * PARTICLE_FADE_STEPS + k: k-th step of fade and resize
+        steps = PARTICLE_FADE_STEPS
+        self.frames = []
+        half = []
+        for color, radius, grow, *_ in PARTICLE_STYLES.values():
+            for k in range(steps):
+                r = max(1, round(radius * (1 + (grow - 1) * k / (steps - 1))))
+                image = pygame.Surface((r * 2, r * 2), pygame.SRCALPHA)
+                pygame.draw.circle(image, (*color, round(255 * (1 - k / steps))), (r, r), r)
+                self.frames.append(convert_surface(image))
+                half.append(r)
+        self.half = np.array(half, dtype=np.float64)
+        self.frame_keys = np.array([id(frame) for frame in self.frames], dtype=np.int64)
+
+    def emit(self, style, x, y, count, speed_scale=1.0, angle=None, spread=360):
+        """Burst count particles of style from (x, y).
+
+        angle (degrees, clockwise on screen) and spread narrow the burst to
+        a cone; the default throws them all round.
+        """
+        count = min(count, self.budget)
+        free = self.budget - self.count
+        if count > free:
+            self.recycle(count - free)
+        sid = self.style_ids[style]
+        _, _, _, (life_lo, life_hi), (speed_lo, speed_hi), _, _ = PARTICLE_STYLES[style]
+        rng = self.rng
+
+        centre = 0 if angle is None else angle
+        headings = np.radians(centre + rng.uniform(-spread / 2, spread / 2, count))
+        speeds = rng.uniform(speed_lo, speed_hi, count) * speed_scale
+        life = rng.integers(life_lo, life_hi + 1, count).astype(np.float64)
+
+        new = slice(self.count, self.count + count)
+        self.x[new] = x
+        self.y[new] = y
+        self.px[new] = x
+        self.py[new] = y
+        self.vx[new] = np.cos(headings) * speeds
+        self.vy[new] = np.sin(headings) * speeds
+        self.life[new] = life
+        self.max_life[new] = life
+        self.style[new] = sid
+        self.count += count
+
+    def recycle(self, n):
+        # Drop the n particles with the least life left
+        live = self.count
+        doomed = np.argpartition(self.life[:live], n - 1)[:n] if n < live else np.arange(live)
+        self.life[doomed] = 0
+        self.compact()
+        self.recycled += n
+
+    def compact(self):
+        n = self.count
+        keep = np.flatnonzero(self.life[:n] > 0)
+        if len(keep) == n:
+            return
+        for column in (self.x, self.y, self.px, self.py, self.vx, self.vy, self.life, self.max_life, self.style):
+            column[:len(keep)] = column[keep]
+        self.count = len(keep)
+
+    def update(self):
+        n = self.count
+        if n == 0:
+            return
+        style = self.style[:n]
+        drag = self.drag[style]
+        self.px[:n] = self.x[:n]
+        self.py[:n] = self.y[:n]
+        self.vx[:n] *= drag
+        self.vy[:n] *= drag
+        self.vy[:n] += self.gravity[style]
+        self.x[:n] += self.vx[:n]
+        self.y[:n] += self.vy[:n]
+        self.life[:n] -= 1
+        self.compact()
+
+    def blit_pairs(self, alpha=1.0):
+        # (surface, position) pairs for every live particle, plus their frame numbers
+        n = self.count
+        if self.frames is None:
+            self.build_frames()
+        age = 1 - self.life[:n] / self.max_life[:n]
+        step = np.minimum((age * PARTICLE_FADE_STEPS).astype(np.int64), PARTICLE_FADE_STEPS - 1)
+        frame = self.style[:n].astype(np.int64) * PARTICLE_FADE_STEPS + step
+        px = self.px[:n]
+        py = self.py[:n]
+        half = self.half[frame]
+        left = np.floor(px + (self.x[:n] - px) * alpha - half).astype(np.int32)
+        top = np.floor(py + (self.y[:n] - py) * alpha - half).astype(np.int32)
+        frames = self.frames
+        return [(frames[f], (lx, ty)) for f, lx, ty in zip(frame.tolist(), left.tolist(), top.tolist())], frame
+
+    def enqueue(self, queue, layer, alpha=1.0):
+        """Queue every live particle on a RenderQueue layer, grouped by frame."""
+        if self.count:
+            pairs, frame = self.blit_pairs(alpha)
+            queue.add_many(layer, pairs, self.frame_keys[frame])
@@ -0,0 +1,168 @@
+"""Bullet patterns: whole boss volleys computed and spawned in one go.
+
+A pattern turns its parameters into an array of headings (degrees,
+clockwise on screen), and PatternEmitter turns that array into velocities
+and rotated sprites with NumPy and hands the volley to
+BulletManager.spawn_many, so a 200-bullet curtain costs about as much to
+fire as a single shot. Boss definitions name patterns in their attacks
+(see boss_defs).
+
+    ring     count shots evenly around the circle
+    spiral   a ring that turns by step degrees after every volley
+    fan      count shots step degrees apart, centred on the player
+    aimed    shots at the player, with fixed offsets or a random spread
+    wave     a fan whose centre sways amplitude degrees either side of the
+             player, advancing rate radians per volley
+"""
+import math
+import inspect
+import numpy as np
+from settings import *
+from bullets import OWNER_BOSS
+from sprite_loader import rotation_cache
+
+# Pattern functions take (emitter, state, **params) and return headings in
+# degrees. state is a dict kept per boss and volley, for patterns that move
+# between volleys.
+
+def ring(emitter, state, count, phase=0.0):
+    return phase + np.arange(count) * (360 / count)
+
+def spiral(emitter, state, count, step, phase=0.0):
+    turn = state.get('turn', phase)
+    state['turn'] = (turn + step) % 360
+    return turn + np.arange(count) * (360 / count)
+
+def fan(emitter, state, count, step):
+    return (np.arange(count) - (count - 1) / 2) * step
+
+def aimed(emitter, state, count=1, spread=0.0, offsets=None):
+    if offsets is not None:
+        return np.array(offsets, dtype=np.float64)
+    if spread == 0:
+        return np.zeros(count)
+    return emitter.uniform(-spread / 2, spread / 2, count)
+
+def wave(emitter, state, count, step, amplitude, rate):
+    t = state.get('t', 0.0)
+    state['t'] = t + rate
+    return fan(emitter, state, count, step) + math.sin(t) * amplitude
+
+# name -> (pattern function, headings are relative to the player)
+PATTERNS = {
+    'ring': (ring, False),
+    'spiral': (spiral, False),
+    'fan': (fan, True),
+    'aimed': (aimed, True),
+    'wave': (wave, True),
+}
+
+class Volley:
+    """One compiled attack: a pattern with its parameters bound, plus the bullet it fires."""
+    __slots__ = ('pattern', 'function', 'relative', 'bullet_type', 'scale', 'speed', 'params')
+
+    def __init__(self, pattern, bullet_type, scale, speed, params):
+        entry = PATTERNS.get(pattern)
+        if entry is None:
+            raise ValueError(f"unknown bullet pattern '{pattern}'")
+        self.function, self.relative = entry
+        try:
+            inspect.signature(self.function).bind(None, None, **params)
+        except TypeError as e:
+            raise ValueError(f"bad parameters for pattern '{pattern}': {e}")
+        self.pattern = pattern
+        self.bullet_type = bullet_type
+        self.scale = scale
+        self.speed = speed
+        self.params = params
+
+    def __repr__(self):
+        return f"Volley({self.pattern!r}, {self.bullet_type!r}, {self.scale}, {self.speed}, {self.params})"
+
+def compile_attacks(attacks):
+    """Volleys for a boss_defs attack list.
+
+    Dict entries name a pattern; (bullet_type, scale, speed, angle_offset)
+    tuples are single aimed shots, and runs of them with the same bullet
+    are merged into one 'aimed' volley with those offsets.
+    """
+    volleys = []
+    shots = []
+    for attack in list(attacks) + [None]:
+        if isinstance(attack, tuple):
+            if shots and shots[0][:3] != attack[:3]:
+                volleys.append(Volley('aimed', *shots[0][:3], {'offsets': tuple(s[3] for s in shots)}))
+                shots = []
+            shots.append(attack)
+            continue
+        if shots:
+            volleys.append(Volley('aimed', *shots[0][:3], {'offsets': tuple(s[3] for s in shots)}))
+            shots = []
+        if attack is not None:
+            params = dict(attack)
+            volleys.append(Volley(params.pop('pattern'), params.pop('bullet', 'brick'),
+                                  params.pop('scale', 0.5), params.pop('speed', 8), params))
+    return tuple(volleys)
+
+class PatternEmitter:
+    """Fires compiled volleys into a BulletManager, one NumPy pass per volley."""
+    def __init__(self, bullets, rng):
+        self.bullets = bullets
+        self.rng = rng # The fight's SimClock RNG
+        self.np_rng = None
+        self.states = {}
+        self.sprite_tables = {}
+
+    def uniform(self, low, high, count):
+        if self.np_rng is None:
+            # Seeded from the fight's RNG on first use, so replays stay deterministic
+            self.np_rng = np.random.default_rng(self.rng.getrandbits(64))
+        return self.np_rng.uniform(low, high, count)
+
+    def sprite_table(self, bullet_type, scale):
+        # Sprite ids of the pre-rotated headings, indexable by an array
+        key = (bullet_type, scale)
+        ids = self.sprite_tables.get(key)
+        if ids is None:
+            table = rotation_cache.get_table(bullet_type, scale)
+            ids = np.array([self.bullets.sprite_id(image) for image in table], dtype=np.int32)
+            self.sprite_tables[key] = ids
+        return ids
+
+    def emit(self, volley, x, y, target_x, target_y, owner_key=None):
+        """Spawn one volley from (x, y); returns the new bullet slots."""
+        state = self.states.get((owner_key, volley))
+        if state is None:
+            state = self.states[(owner_key, volley)] = {}
+        headings = volley.function(self, state, **volley.params)
+
+        if volley.relative:
+            # Same arithmetic as Vector2.normalize().rotate(), so single
+            # aimed shots land exactly where spawn_boss_bullet put them
+            ux, uy = target_x - x, target_y - y
+            length = math.sqrt(ux * ux + uy * uy)
+            if length > 0:
+                ux, uy = ux / length, uy / length
+            else:
+                ux, uy = -1.0, 0.0
+        else:
+            ux, uy = 1.0, 0.0
+        radians = np.fmod(headings * np.pi / 180, 2 * np.pi)
+        radians[radians < 0] += 2 * np.pi
+        cos = np.cos(radians)
+        sin = np.sin(radians)
+        # Exact at right angles (straight down must stay straight down)
+        quarter = headings % 90 == 0
+        if quarter.any():
+            k = (headings[quarter] // 90).astype(np.int64) % 4
+            cos[quarter] = np.array([1.0, 0.0, -1.0, 0.0])[k]
+            sin[quarter] = np.array([0.0, 1.0, 0.0, -1.0])[k]
+        dx = ux * cos - uy * sin
+        dy = ux * sin + uy * cos
+
+        # Pick the pre-rotated sprite for each heading, as get_rotated_projectile does
+        steps = rotation_cache.steps
+        angle = np.degrees(np.arctan2(-dy, dx))
+        index = np.round(angle / rotation_cache.step_angle).astype(np.int64) % steps
+        sprites = self.sprite_table(volley.bullet_type, volley.scale)[index]
+        return self.bullets.spawn_many(x, y, dx * volley.speed, dy * volley.speed, sprites, OWNER_BOSS)
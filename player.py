@@ -1,13 +1,20 @@
 import pygame
 from settings import *
 from sprite_loader import SpriteLoader
+from controls import KeyboardControls
+from sim_clock import SimClock
 
 class Player(pygame.sprite.Sprite):
-    def __init__(self, x, y):
+    def __init__(self, x, y, controls=None, clock=None):
         super().__init__()
+        # Keyboard by default; the headless simulation passes ScriptedControls
+        self.controls = controls if controls is not None else KeyboardControls()
+        self.clock = clock if clock is not None else SimClock()
         self.sprites = SpriteLoader.get_player_sprites()
+        self.bank = SpriteLoader.get_player_bank()
         self.image = self.sprites['idle']
         self.rect = self.image.get_rect(topleft=(x, y))
+        self.prev_pos = self.rect.topleft # Position before the last sim step (for interpolation)
         
         # Movement
         self.direction = pygame.math.Vector2(0, 0)
@@ -36,6 +43,9 @@ class Player(pygame.sprite.Sprite):
         
         # Shooting
         self.shoot_cooldown = 0
+
+        # Effects, set by the battle (None when headless)
+        self.particles = None
         
         # Animation
         self.state = 'idle'
@@ -43,29 +53,29 @@ class Player(pygame.sprite.Sprite):
         self.animation_speed = 0.15
 
     def get_input(self):
-        keys = pygame.key.get_pressed()
+        keys = self.controls
 
-        if keys[pygame.K_DOWN] and self.on_ground:
+        if keys.held(pygame.K_DOWN) and self.on_ground:
             self.is_ducking = True
             self.direction.x = 0 # Can't move while ducking
         else:
             self.is_ducking = False
 
         if not self.is_ducking:
-            if keys[pygame.K_RIGHT]:
+            if keys.held(pygame.K_RIGHT):
                 self.direction.x = 1
                 self.facing_right = True
-            elif keys[pygame.K_LEFT]:
+            elif keys.held(pygame.K_LEFT):
                 self.direction.x = -1
                 self.facing_right = False
             else:
                 self.direction.x = 0
 
-        if keys[pygame.K_SPACE] and self.on_ground and not self.is_ducking:  # Space for Jump
+        if keys.held(pygame.K_SPACE) and self.on_ground and not self.is_ducking:  # Space for Jump
             self.jump()
 
             
-        if keys[pygame.K_c] and not self.is_dashing and self.dash_cooldown == 0:  # C for Dash
+        if keys.held(pygame.K_c) and not self.is_dashing and self.dash_cooldown == 0:  # C for Dash
             self.start_dash()
 
     def start_dash(self):
@@ -81,6 +91,11 @@ class Player(pygame.sprite.Sprite):
         self.dash_cooldown = cooldown
         self.direction.y = 0 # No gravity during dash
 
+        if self.particles is not None:
+            # Puff of smoke kicked up behind the player
+            self.particles.emit('smoke', self.rect.centerx, self.rect.bottom - 10, 12,
+                                angle=180 if self.facing_right else 0, spread=70)
+
     def handle_dash(self):
         if self.is_dashing:
             self.direction.x = 1 if self.facing_right else -1
@@ -92,14 +107,14 @@ class Player(pygame.sprite.Sprite):
             self.dash_cooldown -= 1
 
     def get_shoot_direction(self):
-        keys = pygame.key.get_pressed()
+        keys = self.controls
         dir_vec = pygame.math.Vector2(0, 0)
         
-        if keys[pygame.K_RIGHT]: dir_vec.x = 1
-        elif keys[pygame.K_LEFT]: dir_vec.x = -1
+        if keys.held(pygame.K_RIGHT): dir_vec.x = 1
+        elif keys.held(pygame.K_LEFT): dir_vec.x = -1
         
-        if keys[pygame.K_UP]: dir_vec.y = -1
-        elif keys[pygame.K_DOWN]: dir_vec.y = 1
+        if keys.held(pygame.K_UP): dir_vec.y = -1
+        elif keys.held(pygame.K_DOWN): dir_vec.y = 1
         
         # Default to facing direction if no movement key held
         if dir_vec.length() == 0:
@@ -118,28 +133,23 @@ class Player(pygame.sprite.Sprite):
     def animate(self):
         # Animation logic
         if self.is_dashing:
-            self.image = self.sprites['jump']
+            img_key = 'jump'
         elif not self.on_ground:
-            self.image = self.sprites['jump']
+            img_key = 'jump'
         elif self.is_ducking:
-            self.image = self.sprites['duck']
+            img_key = 'duck'
         elif self.direction.x != 0:
             self.state = 'walk'
             self.frame_index += self.animation_speed
             if self.frame_index >= 2: self.frame_index = 0
             img_key = 'walk_a' if self.frame_index < 1 else 'walk_b'
-            self.image = self.sprites[img_key]
         else:
             self.state = 'idle'
-            self.image = self.sprites['idle']
-
-        if not self.facing_right:
-            self.image = pygame.transform.flip(self.image, True, False)
+            img_key = 'idle'
 
-        # Flash effect when invincible
-        if self.invincible and (pygame.time.get_ticks() // 100) % 2 == 0:
-            self.image = self.image.copy()
-            self.image.fill((255, 255, 255, 150), special_flags=pygame.BLEND_RGBA_MULT)
+        # Flash effect when invincible; facing and flash variants are prebuilt
+        flash = self.invincible and (self.clock.ticks() // 100) % 2 == 0
+        self.image = self.bank.get(img_key, not self.facing_right, flash)
 
 
     def take_damage(self):
@@ -0,0 +1,123 @@
+import queue
+import threading
+import pygame
+from settings import *
+import sprite_loader
+from sprite_loader import SpriteLoader, sprite_cache, convert_surface, decode_scaled
+from boss_defs import get_encounter
+
+def battle_manifest(boss_type):
+    """Every (path, scale, mode) cache key a Battle against boss_type loads."""
+    keys = [(path, scale, 'alpha') for path, scale in SpriteLoader.player_sprite_specs().values()]
+    specs = []
+    for kind, name, *_ in get_encounter(boss_type):
+        if kind == 'boss':
+            specs.extend(SpriteLoader.boss_sprite_specs(name).values())
+        else:
+            specs.append(SpriteLoader.minion_sprite_specs(name))
+    for states in specs:
+        for path, scale in states.values():
+            key = (path, scale, 'alpha')
+            if key not in keys:
+                keys.append(key)
+    keys.append(SpriteLoader.background_key())
+    return keys
+
+# Player bank, then the bosses' banks, each built on a frame of its own
+BANK_STEPS = 2
+
+class PrefetchJob:
+    """One battle's assets: decoded on a worker thread, installed on the main thread."""
+    def __init__(self, name, keys):
+        self.name = name
+        self.keys = keys
+        self.decoded = queue.Queue()
+        self.installed = 0
+        self.banks_built = 0
+        self.error = None
+        self.thread = threading.Thread(target=self.work, name=f"prefetch-{name}", daemon=True)
+        self.thread.start()
+
+    def work(self):
+        sheets = {}
+        for key in self.keys:
+            path, scale, _ = key
+            try:
+                if sprite_loader.asset_bundle is not None and key in sprite_loader.asset_bundle:
+                    image = sprite_loader.asset_bundle.surface(key)
+                else:
+                    image = decode_scaled(path, scale, sheets)
+                self.decoded.put((key, image))
+            except (pygame.error, OSError) as e:
+                # Battle() will load (and report) it synchronously instead
+                self.error = e
+                self.decoded.put((key, None))
+
+    def progress(self):
+        # The two animation bank builds count as final steps
+        return (self.installed + self.banks_built) / (len(self.keys) + BANK_STEPS)
+
+    def ready(self):
+        return self.banks_built == BANK_STEPS
+
+class AssetPrefetcher:
+    """Loads a boss fight's sprites in the background while the player is on the map.
+
+    request() starts a worker thread that decodes and scales the battle's
+    images (no display access). pump(), called once per frame on the main
+    thread, does the convert()/convert_alpha() for a few decoded surfaces,
+    files them in sprite_cache and finally builds the animation banks, so
+    by the time the player presses X, Battle() only hits caches.
+    """
+    def __init__(self, installs_per_frame=PREFETCH_INSTALLS_PER_FRAME):
+        self.installs_per_frame = installs_per_frame
+        self.jobs = {}
+
+    def request(self, boss_type):
+        if boss_type in self.jobs:
+            return self.jobs[boss_type]
+        keys = [key for key in battle_manifest(boss_type) if key not in sprite_cache.surfaces]
+        job = PrefetchJob(boss_type, keys)
+        self.jobs[boss_type] = job
+        return job
+
+    def pump(self, limit=None):
+        """Install up to `limit` decoded surfaces (installs_per_frame by default)."""
+        limit = self.installs_per_frame if limit is None else limit
+        for boss_type, job in self.jobs.items():
+            while limit > 0 and job.installed < len(job.keys):
+                try:
+                    key, image = job.decoded.get_nowait()
+                except queue.Empty:
+                    break
+                # Something may have loaded it synchronously in the meantime
+                if image is not None and key not in sprite_cache.surfaces:
+                    sprite_cache.put(key, convert_surface(image, key[2]))
+                job.installed += 1
+                limit -= 1
+            # Flipped/flash variants take a few ms per bank, so each bank
+            # gets a frame of its own (a whole frame's budget)
+            if limit >= self.installs_per_frame and job.installed == len(job.keys) and not job.ready():
+                if job.banks_built == 0:
+                    SpriteLoader.get_player_bank()
+                else:
+                    for kind, name, *_ in get_encounter(boss_type):
+                        if kind == 'boss':
+                            SpriteLoader.get_boss_banks(name)
+                job.banks_built += 1
+                limit -= self.installs_per_frame
+
+    def progress(self, boss_type):
+        job = self.jobs.get(boss_type)
+        return job.progress() if job is not None else 0.0
+
+    def ready(self, boss_type):
+        job = self.jobs.get(boss_type)
+        return job is not None and job.ready()
+
+    def finish(self, boss_type):
+        # Entering the battle now: install whatever is decoded so far, no waiting
+        if boss_type in self.jobs:
+            self.pump(limit=(len(self.jobs[boss_type].keys) + BANK_STEPS) * self.installs_per_frame)
+
+prefetcher = AssetPrefetcher()
@@ -0,0 +1,198 @@
+import json
+import time
+import numpy as np
+import pygame
+from settings import *
+from fonts import fonts
+
+KIND_SPAN = 0
+KIND_COUNTER = 1
+
+OVERLAY_FONT = ('Arial', 20, False)
+OVERLAY_REFRESH = 15 # frames between overlay redraws
+STAGE_SMOOTHING = 0.1 # weight of the newest frame in the per-stage average
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+NULL_SPAN = _NullSpan()
+
+class _Span:
+    # One reusable span object per stage name, so timing allocates nothing
+    __slots__ = ('profiler', 'name_id', 'start')
+
+    def __init__(self, profiler, name_id):
+        self.profiler = profiler
+        self.name_id = name_id
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        self.profiler.record(KIND_SPAN, self.name_id, self.start, end - self.start)
+        return False
+
+class FrameProfiler:
+    """Per-stage frame timings kept in a fixed-size ring buffer.
+
+    Stages are wrapped in `with profiler.span(name):`. Spans and counters
+    (sprite counts and the like) go into preallocated NumPy columns that
+    wrap around, so a long session keeps only the most recent
+    PROFILER_RING_SIZE records. While disabled, span() hands back a shared
+    no-op context and count() returns immediately.
+    """
+    def __init__(self, enabled=PROFILER, capacity=PROFILER_RING_SIZE):
+        self.enabled = enabled
+        self.capacity = capacity
+        self.kind = np.zeros(capacity, dtype=np.int8)
+        self.name = np.zeros(capacity, dtype=np.int32)
+        self.frame = np.zeros(capacity, dtype=np.int64)
+        self.start = np.zeros(capacity, dtype=np.int64)
+        self.value = np.zeros(capacity, dtype=np.int64) # span duration (ns) or counter value
+        self.head = 0
+        self.size = 0
+
+        self.names = []
+        self.name_ids = {}
+        self.spans = {}
+        self.frame_index = 0
+        self.frame_start = 0
+        self.origin = time.perf_counter_ns()
+
+        # Live numbers for the overlay: this frame's totals and their averages
+        self.frame_totals = {}
+        self.stage_ms = {}
+        self.counts = {}
+        self.frame_ms = 0.0
+        self.overlay_surface = None
+        self.overlay_age = 0
+
+    def name_id(self, name):
+        name_id = self.name_ids.get(name)
+        if name_id is None:
+            name_id = len(self.names)
+            self.names.append(name)
+            self.name_ids[name] = name_id
+        return name_id
+
+    def span(self, name):
+        if not self.enabled:
+            return NULL_SPAN
+        span = self.spans.get(name)
+        if span is None:
+            span = _Span(self, self.name_id(name))
+            self.spans[name] = span
+        return span
+
+    def record(self, kind, name_id, start, value):
+        i = self.head
+        self.kind[i] = kind
+        self.name[i] = name_id
+        self.frame[i] = self.frame_index
+        self.start[i] = start
+        self.value[i] = value
+        self.head = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        if kind == KIND_SPAN:
+            self.frame_totals[name_id] = self.frame_totals.get(name_id, 0) + value
+
+    def count(self, name, value):
+        if self.enabled:
+            self.counts[name] = value
+            self.record(KIND_COUNTER, self.name_id(name), time.perf_counter_ns(), value)
+
+    def begin_frame(self):
+        if self.enabled:
+            self.frame_start = time.perf_counter_ns()
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        end = time.perf_counter_ns()
+        duration = end - self.frame_start
+        self.record(KIND_SPAN, self.name_id('frame'), self.frame_start, duration)
+        self.frame_ms = duration / 1e6
+
+        # Fold this frame's per-stage totals into the running averages
+        for name_id, total in self.frame_totals.items():
+            name = self.names[name_id]
+            previous = self.stage_ms.get(name)
+            ms = total / 1e6
+            self.stage_ms[name] = ms if previous is None else previous + (ms - previous) * STAGE_SMOOTHING
+        self.frame_totals = {}
+        self.frame_index += 1
+
+    def set_enabled(self, enabled):
+        self.enabled = enabled
+        self.frame_totals = {}
+        self.overlay_surface = None
+
+    def handle_event(self, event):
+        """F3 toggles profiling and its overlay, F4 exports the trace."""
+        if event.type != pygame.KEYDOWN:
+            return
+        if event.key == pygame.K_F3:
+            self.set_enabled(not self.enabled)
+        elif event.key == pygame.K_F4 and self.size:
+            self.export_chrome_trace(PROFILER_TRACE_PATH)
+
+    def records(self):
+        """Ring buffer indices in recording order, oldest first."""
+        if self.size < self.capacity:
+            return np.arange(self.size)
+        return (np.arange(self.capacity) + self.head) % self.capacity
+
+    def export_chrome_trace(self, path):
+        """Write the ring buffer as Chrome trace-event JSON (chrome://tracing, Perfetto)."""
+        events = []
+        for i in self.records():
+            name = self.names[self.name[i]]
+            ts = (int(self.start[i]) - self.origin) / 1000 # microseconds
+            if self.kind[i] == KIND_SPAN:
+                events.append({'name': name, 'ph': 'X', 'ts': ts, 'dur': int(self.value[i]) / 1000,
+                               'pid': 1, 'tid': 1, 'args': {'frame': int(self.frame[i])}})
+            else:
+                events.append({'name': name, 'ph': 'C', 'ts': ts, 'pid': 1,
+                               'args': {name: int(self.value[i])}})
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+        return len(events)
+
+    def draw_overlay(self, surface):
+        """Blit the live stage timings and counts; returns the rect drawn."""
+        if not self.enabled:
+            return None
+        # Numbers change every frame, so render the panel directly (not
+        # through the text cache) and only every OVERLAY_REFRESH frames
+        self.overlay_age -= 1
+        if self.overlay_surface is None or self.overlay_age <= 0:
+            self.overlay_surface = self.render_overlay()
+            self.overlay_age = OVERLAY_REFRESH
+        return surface.blit(self.overlay_surface, (10, 10))
+
+    def render_overlay(self):
+        font = fonts.get(*OVERLAY_FONT)
+        lines = [f"frame {self.frame_ms:6.2f} ms"]
+        for name, ms in self.stage_ms.items():
+            if name != 'frame':
+                lines.append(f"{name:<18} {ms:6.2f} ms")
+        for name, value in self.counts.items():
+            lines.append(f"{name:<18} {value:6d}")
+
+        line_height = font.get_linesize()
+        rendered = [font.render(line, True, WHITE) for line in lines]
+        width = max(text.get_width() for text in rendered) + 16
+        panel = pygame.Surface((width, line_height * len(lines) + 12), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        for row, text in enumerate(rendered):
+            panel.blit(text, (8, 6 + row * line_height))
+        return panel
+
+profiler = FrameProfiler()
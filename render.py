@@ -0,0 +1,138 @@
+import pygame
+import numpy as np
+from settings import *
+from profiler import profiler
+
+class DirtyRenderer:
+    """Presents only the screen regions that changed since the last frame.
+
+    Scenes still draw their whole frame into the display surface; they mark
+    the rects of everything that may have moved or changed, and present()
+    pushes last frame's plus this frame's rects with display.update(). A
+    changed scene signature (e.g. a new game state) or a dirty area above
+    the threshold falls back to a full flip(). With `enabled` off, present()
+    is just flip(). Each present() reports its rect count, dirty area and
+    whether it was a full frame to the profiler.
+    """
+    def __init__(self, enabled=DIRTY_RECTS, threshold=DIRTY_RECT_THRESHOLD):
+        self.enabled = enabled
+        self.threshold = threshold
+        self.screen_rect = pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.screen_area = SCREEN_WIDTH * SCREEN_HEIGHT
+        self.previous = []
+        self.current = []
+        self.full = True # First frame is always presented in full
+        self.signature = None
+
+        # Per-frame statistics from the last present()
+        self.frames = 0
+        self.full_frames = 0
+        self.last_rect_count = 0
+        self.last_dirty_area = 0
+        self.last_dirty_fraction = 1.0
+        self.last_full = True
+
+    def mark(self, rect):
+        if self.enabled and rect:
+            self.current.append(pygame.Rect(rect))
+
+    def mark_many(self, rects):
+        if self.enabled and rects:
+            self.current.extend(pygame.Rect(rect) for rect in rects)
+
+    def mark_full(self):
+        self.full = True
+
+    def check_signature(self, signature):
+        # Anything that changes the whole layout (overlays, menus) forces a flip
+        if signature != self.signature:
+            self.signature = signature
+            self.mark_full()
+
+    def present(self):
+        self.frames += 1
+        if not self.enabled:
+            self.last_full = True
+            self.full_frames += 1
+            pygame.display.flip()
+            return
+
+        rects = [rect.clip(self.screen_rect) for rect in self.previous + self.current]
+        rects = [rect for rect in rects if rect.width and rect.height]
+        area = sum(rect.width * rect.height for rect in rects)
+        fraction = area / self.screen_area
+
+        self.last_rect_count = len(rects)
+        self.last_dirty_area = area
+        self.last_dirty_fraction = min(fraction, 1.0)
+        self.last_full = self.full or fraction > self.threshold
+        if self.last_full:
+            self.full_frames += 1
+            pygame.display.flip()
+        elif rects:
+            pygame.display.update(rects)
+
+        self.previous = self.current
+        self.current = []
+        self.full = False
+
+        profiler.count('dirty_rects', self.last_rect_count)
+        profiler.count('dirty_area', self.last_dirty_area)
+        profiler.count('dirty_pct', round(self.last_dirty_fraction * 100))
+        profiler.count('full_frames', self.full_frames)
+
+class RenderQueue:
+    """Collects a frame's (surface, position) blits and submits them in batches.
+
+    Blits are queued into numbered layers; flush() draws the layers in
+    ascending order with one blits() call each (fblits() where pygame has
+    it and no rects are wanted). A layer queued with surface keys is drawn
+    grouped by surface, so runs of the same bullet or particle frame are
+    blitted back to back; only use keys where overlap order within the
+    layer doesn't matter. Other layers keep their queue order.
+    """
+    def __init__(self):
+        self.layers = {} # layer -> (pairs, key arrays)
+        # Batched draw calls and surfaces blitted by the last flush
+        self.last_calls = 0
+        self.last_blits = 0
+
+    def add(self, layer, surface, position):
+        self.add_many(layer, [(surface, position)])
+
+    def add_many(self, layer, pairs, keys=None):
+        """Queue (surface, position) pairs; keys (one int per pair, equal for equal surfaces) group the layer by surface."""
+        if not pairs:
+            return
+        entry = self.layers.get(layer)
+        if entry is None:
+            entry = self.layers[layer] = ([], [])
+        entry[0].extend(pairs)
+        if keys is not None:
+            entry[1].append(keys)
+
+    def flush(self, target, doreturn=False):
+        """Draw and clear every queued layer; with doreturn, returns the blitted rects."""
+        rects = []
+        calls = blits = 0
+        fast = not doreturn and hasattr(target, 'fblits')
+        for layer in sorted(self.layers):
+            pairs, keys = self.layers[layer]
+            if keys:
+                keys = np.concatenate(keys)
+                if len(keys) != len(pairs):
+                    # Some pairs came without keys: key everything by surface identity
+                    keys = np.fromiter((id(surface) for surface, _ in pairs), dtype=np.int64, count=len(pairs))
+                order = np.argsort(keys, kind='stable')
+                pairs = [pairs[i] for i in order.tolist()]
+            if fast:
+                target.fblits(pairs)
+            elif doreturn:
+                rects.extend(target.blits(pairs))
+            else:
+                target.blits(pairs, doreturn=False)
+            calls += 1
+            blits += len(pairs)
+        self.layers.clear()
+        self.last_calls, self.last_blits = calls, blits
+        return rects
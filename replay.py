@@ -0,0 +1,166 @@
+"""Battle input recording and deterministic replay.
+
+    python replay.py last_battle.replay.json           # headless, verify checksum
+    python replay.py last_battle.replay.json --watch   # draw it, uncapped
+
+A recording is the fight's seed, boss, collision mode and starting player
+data plus one input word per simulation step: bit i is INPUT_KEYS[i] held,
+bit len(INPUT_KEYS) + i is INPUT_KEYS[i] newly pressed. Steps are stored as
+run-length [word, count] pairs, since keys are held for many frames.
+"""
+import sys
+import copy
+import json
+import time
+import hashlib
+import pygame
+from settings import *
+from controls import ScriptedControls
+from collision import get_collision_mode, set_collision_mode
+
+REPLAY_VERSION = 1
+
+# Every key a battle reads; the bit order is part of the file format
+INPUT_KEYS = (
+    pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN,
+    pygame.K_SPACE, pygame.K_x, pygame.K_c,
+)
+
+def encode_keys(keys):
+    word = 0
+    for bit, key in enumerate(INPUT_KEYS):
+        if key in keys:
+            word |= 1 << bit
+    return word
+
+def decode_keys(word):
+    return frozenset(key for bit, key in enumerate(INPUT_KEYS) if word >> bit & 1)
+
+def encode_frame(held, pressed):
+    return encode_keys(held) | encode_keys(pressed) << len(INPUT_KEYS)
+
+def decode_frame(word):
+    return decode_keys(word), decode_keys(word >> len(INPUT_KEYS))
+
+def battle_checksum(battle):
+    """Digest of the state a replay must reproduce exactly."""
+    player, boss, bullets = battle.player, battle.boss, battle.bullets
+    live = bullets.live_indices(None)
+    state = (
+        battle.sim_clock.frame, battle.game_state, battle.shots_fired,
+        tuple(player.rect), player.hp, boss.phase, boss.health, tuple(boss.rect),
+        len(live),
+    )
+    # The rest of the hostiles (none in a single-boss fight)
+    others = tuple((entity.health, tuple(entity.rect)) for entity in battle.hostiles if entity is not boss)
+    if others:
+        state += others
+    digest = hashlib.sha1(repr(state).encode())
+    for column in (bullets.x, bullets.y, bullets.vx, bullets.vy, bullets.owner):
+        digest.update(column[live].tobytes())
+    return digest.hexdigest()
+
+class RecordingControls:
+    """Wraps live controls and logs the input each simulation step sees.
+
+    Battle.step() calls consume_pressed() once at the start of every step;
+    that is where the held keys are snapshotted, so the rest of the step
+    reads exactly the state that was recorded.
+    """
+    def __init__(self, controls):
+        self.controls = controls
+        self.held_keys = frozenset()
+        self.runs = [] # [word, count]
+        self.frames = 0
+
+    def press(self, key):
+        self.controls.press(key)
+
+    def poll(self):
+        self.controls.poll()
+
+    def consume_pressed(self):
+        pressed = frozenset(key for key in self.controls.consume_pressed() if key in INPUT_KEYS)
+        self.held_keys = frozenset(key for key in INPUT_KEYS if self.controls.held(key))
+        word = encode_frame(self.held_keys, pressed)
+        if self.runs and self.runs[-1][0] == word:
+            self.runs[-1][1] += 1
+        else:
+            self.runs.append([word, 1])
+        self.frames += 1
+        return pressed
+
+    def held(self, key):
+        return key in self.held_keys
+
+class InputRecorder:
+    """Records one battle: call start() after load_player_data, save() when it ends."""
+    def __init__(self, controls):
+        self.controls = RecordingControls(controls)
+        self.header = None
+
+    def start(self, battle, player_data):
+        self.header = {
+            'version': REPLAY_VERSION,
+            'boss_type': battle.encounter,
+            'seed': battle.sim_clock.seed,
+            'collision_mode': get_collision_mode(),
+            'player_data': copy.deepcopy(player_data),
+        }
+
+    def recording(self, battle):
+        recording = dict(self.header)
+        recording['frames'] = self.controls.frames
+        recording['runs'] = self.controls.runs
+        recording['checksum'] = battle_checksum(battle)
+        return recording
+
+    def save(self, path, battle):
+        with open(path, 'w') as f:
+            json.dump(self.recording(battle), f, separators=(',', ':'))
+
+def load_recording(path):
+    with open(path) as f:
+        recording = json.load(f)
+    if recording.get('version') != REPLAY_VERSION:
+        raise ValueError(f"Unsupported replay version: {recording.get('version')}")
+    return recording
+
+def replay(recording, screen=None):
+    """Re-run a recording as fast as possible; returns (battle, checksum matched).
+
+    With a screen every step is drawn (uncapped); without one it is headless.
+    """
+    from main import Battle
+    # Hits depend on the collision mode, so replay under the recorded one
+    set_collision_mode(recording.get('collision_mode', COLLISION_MODE))
+    controls = ScriptedControls()
+    battle = Battle(screen, recording['boss_type'], controls, recording['seed'])
+    battle.load_player_data(recording['player_data'])
+    for word, count in recording['runs']:
+        held, pressed = decode_frame(word)
+        for _ in range(count):
+            controls.set_frame(held, pressed)
+            battle.step()
+            if screen is not None:
+                pygame.event.pump()
+                battle.draw()
+    return battle, battle_checksum(battle) == recording['checksum']
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("usage: python replay.py RECORDING [--watch]")
+        sys.exit(2)
+    recording = load_recording(sys.argv[1])
+    screen = None
+    if '--watch' in sys.argv:
+        pygame.init()
+        screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    start = time.perf_counter()
+    battle, matched = replay(recording, screen)
+    elapsed = time.perf_counter() - start
+    print(f"{recording['boss_type']} seed {recording['seed']}: {recording['frames']} frames "
+          f"({recording['frames'] / FPS:.1f}s of play) replayed in {elapsed:.3f}s, "
+          f"outcome {battle.game_state}")
+    print("checksum OK" if matched else "checksum MISMATCH: the replay diverged")
+    sys.exit(0 if matched else 1)
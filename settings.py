@@ -1,9 +1,12 @@
+import os
 import pygame
 
 # Screen settings
 SCREEN_WIDTH = 1280
 SCREEN_HEIGHT = 720
-FPS = 60
+FPS = 60  # fixed simulation rate
+RENDER_FPS = 144  # battle render cap, interpolated between sim steps (0 = uncapped)
+MAX_STEPS_PER_FRAME = 5  # sim steps a slow render frame may catch up on
 
 # Colors
 WHITE = (255, 255, 255)
@@ -21,8 +24,44 @@ PLAYER_MOVE_SPEED = 7
 PLAYER_DASH_SPEED = 20
 PLAYER_DASH_DURATION = 15  # frames
 
+# Caches
+SPRITE_CACHE_BUDGET = 64 * 1024 * 1024  # bytes of decoded surfaces kept in memory
+PROJECTILE_ROTATION_STEPS = 16  # pre-rotated headings per projectile sprite
+TEXT_CACHE_SIZE = 256  # rendered text surfaces kept (LRU)
+PLAYER_FLASH_COLOR = (255, 255, 255, 150)  # BLEND_RGBA_MULT tint while invincible
+
+# Rendering
+DIRTY_RECTS = False  # opt-in: present only changed regions with display.update()
+DIRTY_RECT_THRESHOLD = 0.5  # fall back to a full flip above this fraction of the screen
+
+# Profiling
+PROFILER = False  # record per-stage frame timings from startup (F3 toggles in game)
+PROFILER_RING_SIZE = 8192  # spans and counters kept in the ring buffer
+PROFILER_TRACE_PATH = 'frame_trace.json'  # F4 writes the ring buffer here (Chrome trace format)
+
+# Replays
+RECORD_BATTLES = False  # opt-in: log every battle's inputs for deterministic replay
+REPLAY_PATH = 'last_battle.replay.json'  # most recent battle, overwritten each fight
+
+# Prefetching
+PREFETCH_RADIUS = 200  # px from a boss node at which its battle assets start loading
+PREFETCH_INSTALLS_PER_FRAME = 4  # prefetched surfaces converted per overworld frame
+
+# Particles
+PARTICLE_BUDGET = 2000  # live particles at most; bursts past it recycle the nearest-to-expiring
+PARTICLE_FADE_STEPS = 8  # pre-tinted, pre-faded frames per particle style
+
+# Projectiles
+BULLET_CAPACITY = 1024  # preallocated bullet slots (grows by doubling)
+COLLISION_CELL_SIZE = 128  # spatial hash cell size in pixels
+BROADPHASE_MIN_BULLETS = 64  # below this many bullet slots, skip the spatial hash
+COLLISION_MODE = 'hybrid'  # 'rect', 'mask' or 'hybrid' (rect prefilter, then mask)
+
 # Asset Paths
-ASSET_DIR = "/Users/rafael/Library/Mobile Documents/com~apple~CloudDocs/Docs/Second Brain/Projects/cuphead_game/kenney_new-platformer-pack-1"
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ASSET_DIR = os.environ.get('CUPHEAD_ASSET_DIR', os.path.join(BASE_DIR, 'kenney_new-platformer-pack-1'))
+ASSET_BUNDLE_PATH = os.path.join(BASE_DIR, 'assets.bundle')  # built by bundle.py; PNGs are used without it
 SPRITE_DIR = f"{ASSET_DIR}/Sprites"
 PLAYER_SPRITE_PATH = f"{SPRITE_DIR}/Characters/Default"
 BOSS_SPRITE_PATH = f"{SPRITE_DIR}/Enemies/Default"
+SPRITESHEET_DIR = f"{ASSET_DIR}/Spritesheets"
@@ -1,14 +1,18 @@
 import pygame
 import sys
 from settings import *
+from fonts import text_cache
+from render import DirtyRenderer
+from profiler import profiler
 from sprite_loader import SpriteLoader
 
 class Shop:
     def __init__(self, screen):
         self.screen = screen
-        self.font_title = pygame.font.SysFont('Arial', 64, bold=True)
-        self.font_item = pygame.font.SysFont('Arial', 32, bold=True)
-        self.font_desc = pygame.font.SysFont('Arial', 20)
+        # Font keys into the shared font registry / text cache
+        self.font_title = ('Arial', 64, True)
+        self.font_item = ('Arial', 32, True)
+        self.font_desc = ('Arial', 20, False)
         
         # Shop Items
         self.items = [
@@ -18,6 +22,7 @@ class Shop:
             {'name': 'Smoke Dash', 'price': 5, 'desc': 'Invincibility during dash is longer', 'id': 'dash'},
         ]
         self.selected_index = 0
+        self.renderer = DirtyRenderer()
         
         # Assets for the shop
         self.bg_color = (40, 30, 20) # Dark wooden brown
@@ -31,6 +36,7 @@ class Shop:
     def handle_events(self):
         action = None
         for event in pygame.event.get():
+            profiler.handle_event(event)
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
@@ -62,15 +68,17 @@ class Shop:
             print("Not enough coins!")
 
     def draw(self):
+        # The screen is static until the selection or inventory changes
+        self.renderer.check_signature((self.selected_index, self.coins, len(self.purchased_items)))
         self.screen.fill(self.bg_color)
         
         # Title
-        title_surf = self.font_title.render("PORKIND'S EMPORIUM", True, YELLOW)
+        title_surf = text_cache.render(self.font_title, "PORKIND'S EMPORIUM", YELLOW)
         self.screen.blit(title_surf, (SCREEN_WIDTH//2 - title_surf.get_width()//2, 50))
         
         # Coins
         self.screen.blit(self.coin_sprite, (50, 50))
-        coin_text = self.font_item.render(f"x {self.coins}", True, WHITE)
+        coin_text = text_cache.render(self.font_item, f"x {self.coins}", WHITE)
         self.screen.blit(coin_text, (110, 60))
 
         # Items list
@@ -83,20 +91,20 @@ class Shop:
                 pygame.draw.rect(self.screen, YELLOW, (100, start_y + i*100 - 10, SCREEN_WIDTH - 200, 80), 3, border_radius=10)
             
             # Item Name
-            name_surf = self.font_item.render(item['name'], True, color)
+            name_surf = text_cache.render(self.font_item, item['name'], color)
             self.screen.blit(name_surf, (150, start_y + i*100))
             
             # Description
-            desc_surf = self.font_desc.render(item['desc'], True, WHITE)
+            desc_surf = text_cache.render(self.font_desc, item['desc'], WHITE)
             self.screen.blit(desc_surf, (150, start_y + i*100 + 40))
             
             # Price
-            price_surf = self.font_item.render(f"{item['price']}", True, YELLOW)
+            price_surf = text_cache.render(self.font_item, f"{item['price']}", YELLOW)
             self.screen.blit(price_surf, (SCREEN_WIDTH - 200, start_y + i*100 + 10))
             self.screen.blit(self.coin_sprite, (SCREEN_WIDTH - 250, start_y + i*100 + 5))
 
         # Instructions
-        instr_surf = self.font_desc.render("Arrows to Select | X to Buy | ESC to Leave", True, WHITE)
+        instr_surf = text_cache.render(self.font_desc, "Arrows to Select | X to Buy | ESC to Leave", WHITE)
         self.screen.blit(instr_surf, (SCREEN_WIDTH//2 - instr_surf.get_width()//2, SCREEN_HEIGHT - 50))
 
-        pygame.display.flip()
+        self.renderer.present()
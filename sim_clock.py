@@ -0,0 +1,36 @@
+import random
+from settings import *
+
+class SimClock:
+    """Fixed-timestep simulation time plus the battle's seeded RNG.
+
+    Game logic reads time only through ticks(), which counts simulated
+    frames, never the wall clock. A battle therefore plays out identically
+    at any render rate, and headless runs are reproducible from the seed.
+    Real time is fed in with add_time(); the returned step count says how
+    many fixed updates to run, and alpha() is the leftover fraction of a
+    step, used to interpolate rendering.
+    """
+    def __init__(self, seed=None, step=1.0 / FPS):
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.rng = random.Random(self.seed)
+        self.step = step
+        self.frame = 0
+        self.accumulator = 0.0
+
+    def ticks(self):
+        # Milliseconds of simulated time, a drop-in for pygame.time.get_ticks()
+        return int(self.frame * self.step * 1000)
+
+    def advance_frame(self):
+        self.frame += 1
+
+    def add_time(self, real_dt):
+        """Bank real seconds and return how many fixed steps are due."""
+        self.accumulator += min(real_dt, self.step * MAX_STEPS_PER_FRAME)
+        steps = int(self.accumulator / self.step)
+        self.accumulator -= steps * self.step
+        return steps
+
+    def alpha(self):
+        return self.accumulator / self.step
@@ -0,0 +1,108 @@
+"""Headless battles: the full battle rules with no window, no blitting and no frame cap.
+
+    python simulation.py [boss_type] [fights]
+
+A bot is built per fight as bot(seed) and then called as
+bot(battle, frame) -> (held_keys, pressed_keys); it plays through
+ScriptedControls, exactly as the keyboard would. Bots draw any randomness
+from their own generator, never the fight's, so a bot can change without
+changing the boss's patterns.
+"""
+import sys
+import time
+import random
+import pygame
+from settings import *
+from controls import ScriptedControls
+from bullets import OWNER_BOSS
+from main import Battle, new_player_data
+
+TURRET_BOT_REACTION = 0.6 # chance per frame to react to a threat
+
+class IdleBot:
+    """Never touches the controls (a baseline for how fast each boss kills)."""
+    def __init__(self, seed=0):
+        pass
+
+    def __call__(self, battle, frame):
+        return (), ()
+
+class TurretBot:
+    """Stand still, keep firing at the boss and hop over incoming shots."""
+    def __init__(self, seed=0):
+        self.rng = random.Random(f"turret-bot:{seed}")
+
+    def __call__(self, battle, frame):
+        player = battle.player
+        boss = battle.boss
+        held = {pygame.K_x}
+
+        # Turn to face the boss (a single frame of walking)
+        boss_right = boss.rect.centerx > player.rect.centerx
+        if boss_right != player.facing_right:
+            held.add(pygame.K_RIGHT if boss_right else pygame.K_LEFT)
+
+        # Aim straight up when the boss is overhead
+        if boss.rect.bottom < player.rect.top and abs(boss.rect.centerx - player.rect.centerx) < 200:
+            held.add(pygame.K_UP)
+
+        # Jump when a boss shot or the boss itself is about to hit; reactions
+        # are imperfect (drawn from the bot's own RNG) so seeds give different fights
+        danger = player.rect.inflate(160, 80)
+        if battle.bullets.any_in_rect(danger, OWNER_BOSS) or danger.colliderect(boss.rect):
+            if self.rng.random() < TURRET_BOT_REACTION:
+                held.add(pygame.K_SPACE)
+        return held, ()
+
+# Bots by name, so worker processes can be told which one to use
+BOTS = {
+    'idle': IdleBot,
+    'turret': TurretBot,
+}
+
+def simulate_battle(boss_type='slime', bot=TurretBot, player_data=None, max_frames=FPS * 60 * 5, seed=0):
+    """Run one fight to KNOCKOUT, GAMEOVER or max_frames and summarize it.
+
+    The same arguments always replay the exact same fight.
+    """
+    controls = ScriptedControls()
+    battle = Battle(None, boss_type, controls, seed)
+    battle.load_player_data(player_data if player_data is not None else new_player_data())
+    bot = bot(battle.sim_clock.seed)
+
+    frame = 0
+    while battle.game_state == 'PLAYING' and frame < max_frames:
+        held, pressed = bot(battle, frame)
+        controls.set_frame(held, pressed)
+        battle.step()
+        frame += 1
+
+    # GAMEOVER is only flagged on the update after hp reaches 0
+    if battle.game_state == 'PLAYING' and battle.player.hp <= 0:
+        battle.update()
+
+    return {
+        'boss_type': boss_type,
+        'seed': battle.sim_clock.seed,
+        'outcome': battle.game_state,
+        'frames': frame,
+        'boss_phase': battle.boss.phase,
+        'boss_health': battle.boss.health,
+        'player_hp': battle.player.hp,
+        'time_to_kill': frame / FPS if battle.game_state == 'KNOCKOUT' else None,
+        'damage_taken': battle.player.max_hp - max(0, battle.player.hp),
+        'bullets_fired': battle.shots_fired,
+    }
+
+if __name__ == "__main__":
+    boss_type = sys.argv[1] if len(sys.argv) > 1 else 'slime'
+    fights = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    start = time.perf_counter()
+    total_frames = 0
+    for seed in range(fights):
+        result = simulate_battle(boss_type, seed=seed)
+        total_frames += result['frames']
+        print(result)
+    elapsed = time.perf_counter() - start
+    print(f"{fights} fights, {total_frames} frames in {elapsed:.2f}s "
+          f"({total_frames / elapsed / FPS:.0f}x real time)")
@@ -1,91 +1,426 @@
 import pygame
 import os
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
 from settings import *
+from bundle import AssetBundle
+from boss_defs import get_definition, get_minion_definition
+
+class SpriteCache:
+    """Process-wide LRU cache of decoded surfaces keyed by (path, scale, mode).
+
+    The decoded spritesheets that unscaled frames are cut from live here too
+    and count against the same budget. A frame that is a subsurface of its
+    sheet owns no pixels, so it costs nothing itself but keeps its sheet
+    pinned; a sheet no cached frame uses is the first thing evicted.
+
+    Surfaces handed out are shared, so callers must copy() before mutating them.
+    """
+    def __init__(self, budget_bytes=SPRITE_CACHE_BUDGET):
+        self.budget_bytes = budget_bytes
+        self.surfaces = OrderedDict()
+        self.sheets = OrderedDict() # (xml_path, mode) -> TextureAtlas
+        self.sheet_keys = {} # sheet surface -> its key in sheets
+        self.sheet_users = {} # sheet key -> cached frames that are views of it
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def surface_bytes(surface):
+        if surface.get_parent() is not None:
+            return 0 # A view into a sheet; the sheet is charged instead
+        return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+    def get(self, key):
+        surface = self.surfaces.get(key)
+        if surface is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.surfaces.move_to_end(key)
+        return surface
+
+    def put(self, key, surface):
+        if key in self.surfaces:
+            self.drop(key)
+        self.surfaces[key] = surface
+        self.used_bytes += self.surface_bytes(surface)
+        sheet_key = self.sheet_keys.get(surface.get_parent())
+        if sheet_key is not None:
+            self.sheet_users[sheet_key] += 1
+        self.trim(keep=key)
+
+    def drop(self, key):
+        surface = self.surfaces.pop(key)
+        self.used_bytes -= self.surface_bytes(surface)
+        sheet_key = self.sheet_keys.get(surface.get_parent())
+        if sheet_key is not None:
+            self.sheet_users[sheet_key] -= 1
+
+    def get_sheet(self, key):
+        atlas = self.sheets.get(key)
+        if atlas is not None:
+            self.sheets.move_to_end(key)
+        return atlas
+
+    def put_sheet(self, key, atlas):
+        self.sheets[key] = atlas
+        self.sheet_keys[atlas.sheet] = key
+        self.sheet_users[key] = 0
+        self.used_bytes += self.surface_bytes(atlas.sheet)
+        self.trim(keep=key)
+
+    def drop_sheet(self, key):
+        atlas = self.sheets.pop(key)
+        del self.sheet_keys[atlas.sheet]
+        del self.sheet_users[key]
+        self.used_bytes -= self.surface_bytes(atlas.sheet)
+
+    def idle_sheet(self, keep=None):
+        # Least recently used sheet that no cached frame is a view of
+        for key in self.sheets:
+            if self.sheet_users[key] == 0 and key != keep:
+                return key
+        return None
+
+    def trim(self, keep=None):
+        # Unused sheets go first, then least recently used surfaces, but never
+        # the surface or sheet just inserted
+        while self.used_bytes > self.budget_bytes:
+            sheet_key = self.idle_sheet(keep)
+            if sheet_key is not None:
+                self.drop_sheet(sheet_key)
+            else:
+                oldest = next(iter(self.surfaces), None)
+                if oldest is None or oldest == keep:
+                    break
+                self.drop(oldest)
+            self.evictions += 1
+
+    def preload(self, manifest):
+        """Decode every (path, scale[, mode]) entry of the manifest ahead of time."""
+        for entry in manifest:
+            SpriteLoader.load_image(*entry, cache=self)
+
+    def evict(self, scope=None):
+        """Drop cached surfaces whose path starts with scope (everything if None).
+
+        Sheets under scope go too, and so does any sheet left unused by the
+        frames dropped.
+        """
+        users_before = dict(self.sheet_users)
+        for key in list(self.surfaces):
+            if scope is None or key[0].startswith(scope):
+                self.drop(key)
+                self.evictions += 1
+        for key in list(self.sheets):
+            in_scope = scope is None or key[0].startswith(scope)
+            released = self.sheet_users[key] < users_before[key]
+            if self.sheet_users[key] == 0 and (in_scope or released):
+                self.drop_sheet(key)
+                self.evictions += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.surfaces),
+            'sheets': len(self.sheets),
+            'bytes': self.used_bytes,
+            'budget': self.budget_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+sprite_cache = SpriteCache()
+
+# Pre-scaled raw pixels for every known sprite (None until bundle.py has been run)
+asset_bundle = AssetBundle.open()
+
+def convert_surface(image, mode='alpha'):
+    """convert()/convert_alpha() for the display, or the raw decode when headless."""
+    if pygame.display.get_surface() is None:
+        # No window (headless simulation): pixel formats can't be matched, and
+        # nothing is blitted to a screen anyway
+        return image
+    return image.convert_alpha() if mode == 'alpha' else image.convert()
+
+def read_atlas_index(xml_path):
+    """(sheet image path, name -> rect) from a Kenney spritesheet XML."""
+    root = ET.parse(xml_path).getroot()
+    sheet_path = os.path.join(os.path.dirname(xml_path), root.get('imagePath'))
+    rects = {}
+    for sub in root.iter('SubTexture'):
+        rects[sub.get('name')] = pygame.Rect(
+            int(sub.get('x')), int(sub.get('y')),
+            int(sub.get('width')), int(sub.get('height'))
+        )
+    return sheet_path, rects
+
+class TextureAtlas:
+    """One decoded Kenney spritesheet plus its name -> rect index from the XML."""
+    def __init__(self, xml_path, mode='alpha'):
+        sheet_path, self.rects = read_atlas_index(xml_path)
+        sheet = pygame.image.load(sheet_path)
+        self.sheet = convert_surface(sheet, mode)
+
+    def get(self, name):
+        # Subsurfaces share pixels with the sheet, so no decode or copy happens here
+        rect = self.rects.get(name)
+        if rect is None:
+            return None
+        return self.sheet.subsurface(rect)
+
+def atlas_frame_path(path):
+    """Map Sprites/<Category>/<Variant>/<name>.png to (atlas xml path, frame name)."""
+    rel = os.path.relpath(path, SPRITE_DIR)
+    parts = rel.split(os.sep)
+    if len(parts) != 3 or parts[0] == '..' or not parts[2].endswith('.png'):
+        return None, None
+    category, variant, filename = parts
+    xml_path = f"{SPRITESHEET_DIR}/spritesheet-{category.lower()}-{variant.lower()}.xml"
+    return xml_path, filename[:-len('.png')]
+
+def get_atlas(xml_path, mode='alpha', cache=None):
+    """The decoded sheet for xml_path, kept in cache (sprite_cache by default); None when the sheet is unavailable."""
+    if not os.path.exists(xml_path):
+        return None
+    cache = sprite_cache if cache is None else cache
+    key = (xml_path, mode)
+    atlas = cache.get_sheet(key)
+    if atlas is None:
+        atlas = TextureAtlas(xml_path, mode)
+        cache.put_sheet(key, atlas)
+    return atlas
+
+def decode_scaled(path, scale, sheets):
+    """Decode and scale one image without touching the display (safe off the main thread).
+
+    scale is a factor or an exact (width, height). sheets caches the raw
+    spritesheets this worker has already decoded.
+    """
+    image = None
+    xml_path, name = atlas_frame_path(path)
+    if xml_path is not None and os.path.exists(xml_path):
+        if xml_path not in sheets:
+            sheet_path, rects = read_atlas_index(xml_path)
+            sheets[xml_path] = (pygame.image.load(sheet_path), rects)
+        sheet, rects = sheets[xml_path]
+        if name in rects:
+            image = sheet.subsurface(rects[name])
+    if image is None:
+        image = pygame.image.load(path)
+
+    if isinstance(scale, tuple):
+        return pygame.transform.scale(image, scale)
+    if scale != 1.0:
+        return pygame.transform.scale(image, (int(image.get_width() * scale), int(image.get_height() * scale)))
+    return image.copy() # Detach frames from the worker's sheet
+
+class RotationCache:
+    """Pre-rotated copies of a sprite at a fixed angular resolution.
+
+    Angles are quantized to the nearest of `steps` evenly spaced headings, so a
+    shot picks a prebuilt surface instead of calling transform.rotate.
+    """
+    def __init__(self, steps=PROJECTILE_ROTATION_STEPS):
+        self.steps = steps
+        self.step_angle = 360 / steps
+        self.tables = {}
+
+    def get_table(self, projectile_type, scale):
+        key = (projectile_type, scale)
+        table = self.tables.get(key)
+        if table is None:
+            base = SpriteLoader.get_projectile_sprite(projectile_type, scale)
+            table = [pygame.transform.rotate(base, i * self.step_angle) for i in range(self.steps)]
+            self.tables[key] = table
+        return table
+
+    def get(self, projectile_type, scale, angle):
+        index = round(angle / self.step_angle) % self.steps
+        return self.get_table(projectile_type, scale)[index]
+
+rotation_cache = RotationCache()
+
+class AnimationBank:
+    """Facing and flash variants of every animation state, built once at load time.
+
+    animate() only indexes into the bank; surfaces_built counts every surface
+    the banks have ever created, so it stays flat in steady state.
+    """
+    surfaces_built = 0
+
+    def __init__(self, sprites, flash_color=None):
+        self.variants = {}
+        for state, image in sprites.items():
+            flipped = pygame.transform.flip(image, True, False)
+            self.variants[(state, False, False)] = image
+            self.variants[(state, True, False)] = flipped
+            AnimationBank.surfaces_built += 1
+            if flash_color is not None:
+                for is_flipped, base in ((False, image), (True, flipped)):
+                    flash = base.copy()
+                    flash.fill(flash_color, special_flags=pygame.BLEND_RGBA_MULT)
+                    self.variants[(state, is_flipped, True)] = flash
+                    AnimationBank.surfaces_built += 1
+
+    def get(self, state, flipped=False, flash=False):
+        variant = self.variants.get((state, flipped, flash))
+        if variant is None:
+            variant = self.variants[(state, flipped, False)]
+        return variant
+
+    def __contains__(self, state):
+        return (state, False, False) in self.variants
+
+# Banks are shared by every Player/Boss built from the same sprite set
+animation_banks = {}
 
 class SpriteLoader:
     @staticmethod
-    def load_image(path, scale=1.0):
-        image = pygame.image.load(path).convert_alpha()
-        if scale != 1.0:
-            width = int(image.get_width() * scale)
-            height = int(image.get_height() * scale)
-            image = pygame.transform.scale(image, (width, height))
+    def load_bundled(key):
+        """Surface for a (path, scale, mode) key straight from the asset bundle, or None."""
+        if asset_bundle is None or key not in asset_bundle:
+            return None
+        view = asset_bundle.view(key)
+        image = convert_surface(view, key[2])
+        # Headless, convert_surface hands the view back: copy it off the mapped file
+        return view.copy() if image is view else image
+
+    @staticmethod
+    def load_source(path, mode='alpha', cache=None):
+        """Unscaled surface for path, taken from its spritesheet when one covers it."""
+        xml_path, name = atlas_frame_path(path)
+        if xml_path is not None:
+            atlas = get_atlas(xml_path, mode, cache)
+            frame = atlas.get(name) if atlas is not None else None
+            if frame is not None:
+                return frame
+
+        image = pygame.image.load(path)
+        return convert_surface(image, mode)
+
+    @staticmethod
+    def load_image(path, scale=1.0, mode='alpha', cache=None):
+        # mode: 'alpha' -> convert_alpha(), 'opaque' -> convert()
+        # cache: the SpriteCache to look up and fill, sprite_cache by default
+        cache = sprite_cache if cache is None else cache
+        key = (path, scale, mode)
+        image = cache.get(key)
+        if image is not None:
+            return image
+
+        image = SpriteLoader.load_bundled(key)
+        if image is None:
+            # Scaled variants are built once from the atlas frame and then cached
+            image = SpriteLoader.load_source(path, mode, cache)
+            if scale != 1.0:
+                width = int(image.get_width() * scale)
+                height = int(image.get_height() * scale)
+                image = pygame.transform.scale(image, (width, height))
+        cache.put(key, image)
         return image
 
     @staticmethod
-    def get_player_sprites():
+    def player_sprite_specs():
+        """state -> (path, scale) of the battle player's sprites."""
         # Using character_pink as Cuphead proxy
         base_path = f"{PLAYER_SPRITE_PATH}/character_pink_"
-        states = {
-            'idle': SpriteLoader.load_image(f"{base_path}idle.png", 1.0),
-            'walk_a': SpriteLoader.load_image(f"{base_path}walk_a.png", 1.0),
-            'walk_b': SpriteLoader.load_image(f"{base_path}walk_b.png", 1.0),
-            'jump': SpriteLoader.load_image(f"{base_path}jump.png", 1.0),
-            'duck': SpriteLoader.load_image(f"{base_path}duck.png", 1.0),
-            'hit': SpriteLoader.load_image(f"{base_path}hit.png", 1.0),
+        return {
+            'idle': (f"{base_path}idle.png", 1.0),
+            'walk_a': (f"{base_path}walk_a.png", 1.0),
+            'walk_b': (f"{base_path}walk_b.png", 1.0),
+            'jump': (f"{base_path}jump.png", 1.0),
+            'duck': (f"{base_path}duck.png", 1.0),
+            'hit': (f"{base_path}hit.png", 1.0),
         }
 
-        return states
+    @staticmethod
+    def boss_sprite_specs(boss_type='slime'):
+        """phase -> state -> (path, scale); phases may share one state dict."""
+        # Phases that share a sprite set in the definition share one spec dict
+        built = {}
+        specs = {}
+        for phase, phase_def in get_definition(boss_type).items():
+            sprites = phase_def['sprites']
+            if id(sprites) not in built:
+                base, scale, states = sprites
+                built[id(sprites)] = {state: (f"{base}{suffix}.png", scale) for state, suffix in states.items()}
+            specs[phase] = built[id(sprites)]
+        return specs
+
+    @staticmethod
+    def minion_sprite_specs(minion_type):
+        """state -> (path, scale) of a minion's sprites."""
+        base, scale, states = get_minion_definition(minion_type)['sprites']
+        return {state: (f"{base}{suffix}.png", scale) for state, suffix in states.items()}
+
+    @staticmethod
+    def load_states(specs):
+        return {state: SpriteLoader.load_image(path, scale) for state, (path, scale) in specs.items()}
+
+    @staticmethod
+    def get_player_sprites():
+        return SpriteLoader.load_states(SpriteLoader.player_sprite_specs())
 
     @staticmethod
     def get_boss_sprites(boss_type='slime'):
-        if boss_type == 'bee':
-            base = f"{BOSS_SPRITE_PATH}/bee_"
-            states = {
-                'idle': SpriteLoader.load_image(f"{base}rest.png", 5),
-                'walk_a': SpriteLoader.load_image(f"{base}a.png", 5),
-                'walk_b': SpriteLoader.load_image(f"{base}b.png", 5),
-            }
-            return {'intro': states, 'phase1': states, 'phase2': states}
-            
-        elif boss_type == 'ladybug':
-            base = f"{BOSS_SPRITE_PATH}/ladybug_"
-            states = {
-                'idle': SpriteLoader.load_image(f"{base}rest.png", 5),
-                'walk_a': SpriteLoader.load_image(f"{base}walk_a.png", 5),
-                'walk_b': SpriteLoader.load_image(f"{base}walk_b.png", 5),
-                'death': SpriteLoader.load_image(f"{base}fly.png", 5),
-            }
-            return {'intro': states, 'phase1': states, 'phase2': states}
-
-        # Default Slime King
-        # Phase 0: Intro (Slime Spike)
-        intro_base = f"{ASSET_DIR}/Sprites/Enemies/Double/slime_spike_"
-        intro_states = {
-            'idle': SpriteLoader.load_image(f"{intro_base}rest.png", 2.5),
-            'walk_a': SpriteLoader.load_image(f"{intro_base}walk_a.png", 2.5),
-            'walk_b': SpriteLoader.load_image(f"{intro_base}walk_b.png", 2.5),
-        }
+        # Phases sharing a spec dict also share the loaded dict
+        loaded = {}
+        sprites = {}
+        for phase, specs in SpriteLoader.boss_sprite_specs(boss_type).items():
+            if id(specs) not in loaded:
+                loaded[id(specs)] = SpriteLoader.load_states(specs)
+            sprites[phase] = loaded[id(specs)]
+        return sprites
 
-        # Phase 1: Normal Slime
-        phase1_base = f"{BOSS_SPRITE_PATH}/slime_normal_"
-        phase1_states = {
-            'idle': SpriteLoader.load_image(f"{phase1_base}rest.png", 5),
-            'walk_a': SpriteLoader.load_image(f"{phase1_base}walk_a.png", 5),
-            'walk_b': SpriteLoader.load_image(f"{phase1_base}walk_b.png", 5),
-            'death': SpriteLoader.load_image(f"{phase1_base}flat.png", 5),
-        }
+    @staticmethod
+    def get_minion_sprites(minion_type):
+        return SpriteLoader.load_states(SpriteLoader.minion_sprite_specs(minion_type))
 
-        # Phase 2: Fire Slime
-        phase2_base = f"{BOSS_SPRITE_PATH}/slime_fire_"
-        phase2_states = {
-            'idle': SpriteLoader.load_image(f"{phase2_base}rest.png", 5),
-            'walk_a': SpriteLoader.load_image(f"{phase2_base}walk_a.png", 5),
-            'walk_b': SpriteLoader.load_image(f"{phase2_base}walk_b.png", 5),
-            'death': SpriteLoader.load_image(f"{phase2_base}flat.png", 5),
-        }
+    @staticmethod
+    def get_player_bank():
+        key = ('player',)
+        if key not in animation_banks:
+            animation_banks[key] = AnimationBank(SpriteLoader.get_player_sprites(), PLAYER_FLASH_COLOR)
+        return animation_banks[key]
 
-        return {
-            'intro': intro_states,
-            'phase1': phase1_states,
-            'phase2': phase2_states
-        }
+    @staticmethod
+    def get_boss_banks(boss_type='slime'):
+        key = ('boss', boss_type)
+        if key not in animation_banks:
+            all_sprites = SpriteLoader.get_boss_sprites(boss_type)
+            # Phases that share one state dict also share one bank
+            built = {}
+            banks = {}
+            for phase, states in all_sprites.items():
+                if id(states) not in built:
+                    built[id(states)] = AnimationBank(states)
+                banks[phase] = built[id(states)]
+            animation_banks[key] = banks
+        return animation_banks[key]
 
     @staticmethod
-    def get_background():
+    def background_key():
+        # Scaled to the screen size rather than by a factor
         path = f"{SPRITE_DIR}/Backgrounds/Default/background_color_hills.png"
-        image = pygame.image.load(path).convert()
-        image = pygame.transform.scale(image, (SCREEN_WIDTH, SCREEN_HEIGHT))
+        return (path, (SCREEN_WIDTH, SCREEN_HEIGHT), 'opaque')
+
+    @staticmethod
+    def get_background():
+        key = SpriteLoader.background_key()
+        image = sprite_cache.get(key)
+        if image is None:
+            image = SpriteLoader.load_bundled(key)
+            if image is None:
+                path, size, mode = key
+                image = SpriteLoader.load_source(path, mode)
+                image = pygame.transform.scale(image, size)
+            sprite_cache.put(key, image)
         return image
 
     @staticmethod
@@ -95,3 +430,8 @@ class SpriteLoader:
         else:
             path = f"{SPRITE_DIR}/Tiles/Default/fireball.png"
         return SpriteLoader.load_image(path, scale)
+
+    @staticmethod
+    def get_rotated_projectile(projectile_type='fireball', scale=1.0, angle=0):
+        # angle in degrees, counter-clockwise like pygame.transform.rotate
+        return rotation_cache.get(projectile_type, scale, angle)
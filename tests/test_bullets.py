@@ -0,0 +1,59 @@
+import numpy as np
+import pygame
+from settings import *
+from bullets import BulletManager, OWNER_PLAYER, OWNER_BOSS
+
+def test_freed_slots_are_reused_before_growing():
+    bullets = BulletManager(capacity=4)
+    surface = pygame.Surface((10, 10))
+    slots = [bullets.spawn(100, 100, 0, 0, surface, OWNER_BOSS) for _ in range(4)]
+    assert slots == [0, 1, 2, 3]
+    bullets.kill([1, 2])
+    assert {bullets.spawn(100, 100, 0, 0, surface, OWNER_BOSS) for _ in range(2)} == {1, 2}
+    assert bullets.capacity == 4
+
+    # A full manager grows and keeps every live bullet where it was
+    bullets.x[:4] = [1, 2, 3, 4]
+    bullets.spawn(100, 100, 0, 0, surface, OWNER_BOSS)
+    assert bullets.capacity == 8
+    assert bullets.x[:4].tolist() == [1, 2, 3, 4]
+    assert bullets.count() == 5
+
+def test_spawn_many_takes_the_same_slots_as_spawn():
+    surface = pygame.Surface((10, 10))
+    one, many = BulletManager(capacity=8), BulletManager(capacity=8)
+    for bullets in (one, many):
+        for _ in range(6):
+            bullets.spawn(0, 0, 0, 0, surface, OWNER_BOSS)
+        bullets.kill([4, 1, 3])
+    sid = many.sprite_id(surface)
+    expected = [one.spawn(50, 60, vx, 1, surface, OWNER_BOSS) for vx in range(5)]
+    slots = many.spawn_many(50, 60, np.arange(5.0), np.ones(5), np.full(5, sid), OWNER_BOSS)
+    assert slots.tolist() == expected
+    assert many.free == one.free
+    for name in ('x', 'y', 'vx', 'vy', 'owner', 'alive'):
+        assert np.array_equal(getattr(many, name)[:many.top], getattr(one, name)[:one.top])
+
+def test_cull_rules_per_owner():
+    bullets = BulletManager()
+    surface = pygame.Surface((20, 20))
+    # Player shots die once their top-left leaves the screen
+    inside = bullets.spawn(SCREEN_WIDTH - 5, 300, 0, 0, surface, OWNER_PLAYER) # left edge still on screen
+    outside = bullets.spawn(SCREEN_WIDTH + 11, 300, 0, 0, surface, OWNER_PLAYER)
+    above = bullets.spawn(300, 9, 0, 0, surface, OWNER_PLAYER) # top at -1
+    # Boss shots live until their center is more than 100px outside
+    margin = bullets.spawn(-100, -100, 0, 0, surface, OWNER_BOSS)
+    beyond = bullets.spawn(SCREEN_WIDTH + 101, 300, 0, 0, surface, OWNER_BOSS)
+    bullets.update()
+    alive = bullets.alive
+    assert alive[inside] and alive[margin]
+    assert not (alive[outside] or alive[above] or alive[beyond])
+
+def test_update_moves_and_keeps_previous_position():
+    bullets = BulletManager()
+    slot = bullets.spawn(100.25, 200.5, 1.5, -2.0, pygame.Surface((10, 10)), OWNER_BOSS)
+    bullets.update()
+    assert (bullets.px[slot], bullets.py[slot]) == (100.25, 200.5)
+    assert (bullets.x[slot], bullets.y[slot]) == (101.75, 198.5)
+    left, top, _, _ = bullets.rects(np.array([slot]), alpha=0.5)
+    assert (left[0], top[0]) == (int(np.floor(101.0 - 5)), int(np.floor(199.5 - 5)))
@@ -0,0 +1,73 @@
+import numpy as np
+import pygame
+import pytest
+from settings import *
+from bullets import BulletManager, OWNER_PLAYER, OWNER_BOSS
+
+class BulletSprite(pygame.sprite.Sprite):
+    def __init__(self, slot, rect):
+        super().__init__()
+        self.slot = slot
+        self.rect = rect
+
+def make_bullets(rng, count):
+    bullets = BulletManager()
+    sizes = [(4, 4), (12, 30), (60, 20), (150, 150)]
+    surfaces = [pygame.Surface(size) for size in sizes]
+    for i in range(count):
+        x = rng.uniform(-200, SCREEN_WIDTH + 200)
+        y = rng.uniform(-200, SCREEN_HEIGHT + 200)
+        bullets.spawn(x, y, 0, 0, surfaces[i % len(surfaces)], OWNER_PLAYER if i % 3 else OWNER_BOSS)
+    return bullets
+
+def mirror_group(bullets, owner):
+    # One pygame sprite per live bullet of owner, with the same rect
+    group = pygame.sprite.Group()
+    live = bullets.live_indices(owner)
+    for slot, left, top, w, h in zip(live.tolist(), *(column.tolist() for column in bullets.rects(live))):
+        group.add(BulletSprite(slot, pygame.Rect(left, top, w, h)))
+    return group
+
+def random_rect(rng):
+    return pygame.Rect(int(rng.integers(-100, SCREEN_WIDTH)), int(rng.integers(-100, SCREEN_HEIGHT)),
+                       int(rng.integers(1, 300)), int(rng.integers(1, 300)))
+
+# Below and above BROADPHASE_MIN_BULLETS, so both the scan and the grid are covered
+@pytest.mark.parametrize("count", [BROADPHASE_MIN_BULLETS // 2, 1500])
+def test_collide_rect_matches_spritecollide(count):
+    rng = np.random.default_rng(count)
+    bullets = make_bullets(rng, count)
+    group = mirror_group(bullets, OWNER_PLAYER)
+    for i in range(300):
+        rect = random_rect(rng)
+        dokill = i % 2 == 0
+        probe = BulletSprite(-1, rect)
+        expected = {sprite.slot for sprite in pygame.sprite.spritecollide(probe, group, dokill)}
+        hits = bullets.collide_rect(rect, OWNER_PLAYER, dokill=dokill)
+        assert sorted(hits.tolist()) == sorted(expected)
+        if i % 50 == 0:
+            # Moving bullets leaves the grid stale until the next query rebuilds it
+            bullets.update()
+            group = mirror_group(bullets, OWNER_PLAYER)
+
+def test_collide_boxes_matches_collide_rect():
+    rng = np.random.default_rng(7)
+    bullets = make_bullets(rng, 1500)
+    bullets.kill(bullets.live_indices()[::5])
+    rects = [random_rect(rng) for _ in range(40)]
+    boxes = np.array([tuple(rect) for rect in rects], dtype=np.int32)
+    box, slots = bullets.collide_boxes(boxes, OWNER_PLAYER)
+    for i, rect in enumerate(rects):
+        expected = bullets.collide_rect(rect, OWNER_PLAYER, dokill=False)
+        assert sorted(slots[box == i].tolist()) == sorted(expected.tolist())
+
+def test_broadphase_counts_pairs():
+    rng = np.random.default_rng(3)
+    bullets = make_bullets(rng, 1500)
+    grid = bullets.grid
+    grid.begin_frame()
+    hits = bullets.collide_rect(pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT), OWNER_PLAYER, dokill=False)
+    assert grid.hit == len(hits)
+    assert grid.tested >= grid.hit
+    grid.begin_frame()
+    assert (grid.last_hit, grid.tested) == (len(hits), 0)
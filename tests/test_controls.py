@@ -0,0 +1,16 @@
+import pygame
+from controls import KeyboardControls
+
+def test_held_reads_one_snapshot_per_poll(monkeypatch):
+    calls = []
+    def get_pressed():
+        calls.append(1)
+        return {pygame.K_x: True, pygame.K_LEFT: False}
+    monkeypatch.setattr(pygame.key, 'get_pressed', get_pressed)
+
+    controls = KeyboardControls()
+    controls.poll()
+    assert controls.held(pygame.K_x)
+    assert not controls.held(pygame.K_LEFT)
+    assert controls.held(pygame.K_x)
+    assert len(calls) == 1
@@ -0,0 +1,31 @@
+import random
+import pygame
+from settings import *
+from overworld import Island1
+
+def test_tile_grid_matches_spritecollide(screen):
+    island = Island1(screen)
+    player = island.player
+    rng = random.Random(0)
+    for _ in range(20000):
+        player.rect.center = (rng.randrange(-50, SCREEN_WIDTH + 50), rng.randrange(-50, SCREEN_HEIGHT + 50))
+        expected_blocked = bool(pygame.sprite.spritecollide(player, island.obstacle_group, False))
+        assert island.grid.blocked(player.rect) == expected_blocked
+        touching = pygame.sprite.spritecollide(player, island.node_group, False)
+        node = island.grid.node_at(player.rect)
+        assert (node is None) == (not touching)
+        assert node is None or node in touching
+
+def test_apply_progress_matches_fresh_bake(screen):
+    island = Island1(screen)
+    island.bake_static_layer()
+    before = pygame.image.tobytes(island.static_layer, 'RGB')
+    progress = {'defeated_bosses': ['slime', 'bee'], 'has_key': True, 'is_portal_unlocked': True}
+    island.apply_progress(progress)
+
+    fresh = Island1(screen, ['slime', 'bee'], True, True)
+    fresh.bake_static_layer()
+    assert island.static_layer_key == fresh.static_layer_key
+    after = pygame.image.tobytes(island.static_layer, 'RGB')
+    assert after != before
+    assert after == pygame.image.tobytes(fresh.static_layer, 'RGB')
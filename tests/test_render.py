@@ -0,0 +1,52 @@
+import numpy as np
+import pygame
+from render import RenderQueue
+
+def solid(color, size=(20, 20)):
+    surface = pygame.Surface(size)
+    surface.fill(color)
+    return surface
+
+def test_flush_matches_blits_in_layer_order():
+    red, green, blue = solid((255, 0, 0)), solid((0, 255, 0)), solid((0, 0, 255))
+    # Queued out of layer order; unkeyed layers keep their queue order
+    queue = RenderQueue()
+    queue.add(2, blue, (15, 15))
+    queue.add_many(0, [(red, (0, 0)), (green, (10, 10)), (red, (20, 20))])
+    queue.add(1, green, (5, 5))
+
+    expected = pygame.Surface((64, 64))
+    for surface, position in [(red, (0, 0)), (green, (10, 10)), (red, (20, 20)), (green, (5, 5)), (blue, (15, 15))]:
+        expected.blit(surface, position)
+    target = pygame.Surface((64, 64))
+    rects = queue.flush(target, doreturn=True)
+
+    assert pygame.image.tobytes(target, 'RGB') == pygame.image.tobytes(expected, 'RGB')
+    assert len(rects) == 5
+    assert (queue.last_calls, queue.last_blits) == (3, 5)
+    assert queue.layers == {}
+
+def test_keyed_layer_is_grouped_by_surface():
+    a, b = solid((255, 0, 0)), solid((0, 0, 255))
+    pairs = [(a, (0, 0)), (b, (30, 0)), (a, (60, 0)), (b, (90, 0))]
+    queue = RenderQueue()
+    queue.add_many(0, pairs, np.array([id(surface) for surface, _ in pairs], dtype=np.int64))
+
+    order = []
+    class Recorder:
+        def blits(self, sequence, doreturn=True):
+            order.extend(surface for surface, _ in sequence)
+            return []
+    queue.flush(Recorder())
+    # Grouped by key, and stable within each group
+    assert order in ([a, a, b, b], [b, b, a, a])
+    assert queue.last_calls == 1
+
+def test_partly_keyed_layer_falls_back_to_surface_identity():
+    a, b = solid((255, 0, 0)), solid((0, 0, 255))
+    queue = RenderQueue()
+    queue.add_many(0, [(a, (0, 0)), (b, (10, 0))], np.array([id(a), id(b)], dtype=np.int64))
+    queue.add_many(0, [(a, (20, 0))])
+    target = pygame.Surface((40, 20))
+    assert len(queue.flush(target, doreturn=True)) == 3
+    assert queue.last_blits == 3
@@ -0,0 +1,59 @@
+import pygame
+import pytest
+from settings import *
+from controls import ScriptedControls
+from collision import get_collision_mode, set_collision_mode
+from main import Battle, new_player_data
+from replay import InputRecorder, INPUT_KEYS, encode_frame, decode_frame, load_recording, replay
+from simulation import TurretBot
+
+@pytest.fixture(autouse=True)
+def restore_collision_mode():
+    mode = get_collision_mode()
+    yield
+    set_collision_mode(mode)
+
+def record_fight(path, boss_type, seed, frames):
+    # Drive a battle through the recorder the way Game does, with a bot at the keys
+    scripted = ScriptedControls()
+    recorder = InputRecorder(scripted)
+    battle = Battle(None, boss_type, recorder.controls, seed)
+    player_data = new_player_data()
+    battle.load_player_data(player_data)
+    recorder.start(battle, player_data)
+    bot = TurretBot(seed)
+    for frame in range(frames):
+        held, pressed = bot(battle, frame)
+        scripted.set_frame(held, pressed)
+        battle.step()
+    recorder.save(path, battle)
+    return load_recording(path)
+
+def test_frame_words_round_trip():
+    held = frozenset(INPUT_KEYS[::2])
+    pressed = frozenset(INPUT_KEYS[1::3])
+    assert decode_frame(encode_frame(held, pressed)) == (held, pressed)
+
+@pytest.mark.parametrize("boss_type", ['slime', 'bee', 'ladybug', 'twins'])
+def test_replay_reproduces_the_recorded_fight(tmp_path, boss_type):
+    recording = record_fight(tmp_path / 'fight.json', boss_type, seed=5, frames=900)
+    assert recording['frames'] == 900
+    battle, matched = replay(recording)
+    assert matched
+    assert battle.sim_clock.frame == 900
+
+def test_replay_detects_divergence(tmp_path):
+    recording = record_fight(tmp_path / 'fight.json', 'slime', seed=2, frames=600)
+    # The same number of steps with no keys held
+    recording['runs'] = [[0, recording['frames']]]
+    _, matched = replay(recording)
+    assert not matched
+
+def test_replay_uses_the_recorded_collision_mode(tmp_path):
+    set_collision_mode('rect')
+    recording = record_fight(tmp_path / 'fight.json', 'ladybug', seed=3, frames=900)
+    assert recording['collision_mode'] == 'rect'
+    set_collision_mode('mask')
+    _, matched = replay(recording)
+    assert matched
+    assert get_collision_mode() == 'rect'
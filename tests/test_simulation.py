@@ -0,0 +1,11 @@
+import farm
+from simulation import BOTS, TurretBot, simulate_battle
+
+def test_farm_bot_names_match_simulation():
+    # farm.py validates --bots without importing pygame, so it keeps its own list
+    assert sorted(farm.BOT_NAMES) == sorted(BOTS)
+
+def test_simulation_is_deterministic():
+    first = simulate_battle('slime', TurretBot, max_frames=600, seed=4)
+    second = simulate_battle('slime', TurretBot, max_frames=600, seed=4)
+    assert first == second
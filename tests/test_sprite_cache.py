@@ -0,0 +1,78 @@
+import pygame
+from sprite_loader import SpriteCache
+
+class FakeAtlas:
+    def __init__(self, size):
+        self.sheet = pygame.Surface(size, pygame.SRCALPHA)
+
+def nbytes(surface):
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+def test_views_are_free_and_sheets_are_charged_once():
+    cache = SpriteCache(budget_bytes=1 << 30)
+    atlas = FakeAtlas((200, 100))
+    cache.put_sheet(('sheet.xml', 'alpha'), atlas)
+    cache.put(('a.png', 1.0, 'alpha'), atlas.sheet.subsurface((0, 0, 50, 50)))
+    cache.put(('b.png', 1.0, 'alpha'), atlas.sheet.subsurface((50, 0, 50, 50)))
+    scaled = pygame.Surface((30, 30), pygame.SRCALPHA)
+    cache.put(('a.png', 0.5, 'alpha'), scaled)
+    assert cache.stats()['bytes'] == nbytes(atlas.sheet) + nbytes(scaled)
+    assert cache.sheet_users[('sheet.xml', 'alpha')] == 2
+
+def test_unused_sheet_is_evicted_before_frames():
+    sheet_size = (100, 100)
+    budget = nbytes(pygame.Surface(sheet_size, pygame.SRCALPHA)) + 10_000
+    cache = SpriteCache(budget_bytes=budget)
+    atlas = FakeAtlas(sheet_size)
+    cache.put_sheet(('sheet.xml', 'alpha'), atlas)
+    cache.put(('a.png', 0.5, 'alpha'), pygame.Surface((40, 40), pygame.SRCALPHA)) # 6400 bytes, fits
+    cache.put(('b.png', 0.5, 'alpha'), pygame.Surface((40, 40), pygame.SRCALPHA)) # over budget
+    assert cache.sheets == {}
+    assert len(cache.surfaces) == 2
+    assert cache.used_bytes == 2 * 6400
+
+def test_sheet_in_use_is_pinned():
+    cache = SpriteCache(budget_bytes=1)
+    atlas = FakeAtlas((100, 100))
+    cache.put_sheet(('sheet.xml', 'alpha'), atlas)
+    assert ('sheet.xml', 'alpha') in cache.sheets # Just inserted, kept
+    cache.put(('a.png', 1.0, 'alpha'), atlas.sheet.subsurface((0, 0, 10, 10)))
+    assert ('sheet.xml', 'alpha') in cache.sheets # Its frame is still cached
+    cache.put(('b.png', 0.5, 'alpha'), pygame.Surface((10, 10), pygame.SRCALPHA))
+    # The view went, which unpinned the sheet, which went next
+    assert list(cache.surfaces) == [('b.png', 0.5, 'alpha')]
+    assert cache.sheets == {}
+
+def test_evict_scope_releases_sheets():
+    cache = SpriteCache(budget_bytes=1 << 30)
+    enemies, tiles = FakeAtlas((64, 64)), FakeAtlas((64, 64))
+    cache.put_sheet(('sheets/enemies.xml', 'alpha'), enemies)
+    cache.put_sheet(('sheets/tiles.xml', 'alpha'), tiles)
+    cache.put(('sprites/enemies/bee.png', 1.0, 'alpha'), enemies.sheet.subsurface((0, 0, 8, 8)))
+    cache.put(('sprites/tiles/grass.png', 1.0, 'alpha'), tiles.sheet.subsurface((0, 0, 8, 8)))
+    cache.evict('sprites/enemies')
+    assert list(cache.sheets) == [('sheets/tiles.xml', 'alpha')]
+    assert cache.used_bytes == nbytes(tiles.sheet)
+    cache.evict()
+    assert cache.used_bytes == 0 and cache.sheets == {} and not cache.surfaces
+
+def test_evict_scope_keeps_unrelated_idle_sheets():
+    cache = SpriteCache(budget_bytes=1 << 30)
+    cache.put_sheet(('sheets/tiles.xml', 'alpha'), FakeAtlas((64, 64)))
+    cache.put(('sprites/enemies/bee.png', 0.5, 'alpha'), pygame.Surface((8, 8)))
+    cache.evict('sprites/enemies')
+    assert list(cache.sheets) == [('sheets/tiles.xml', 'alpha')]
+    cache.evict('sheets/')
+    assert cache.sheets == {}
+
+def test_preload_fills_its_own_cache(screen, monkeypatch):
+    import sprite_loader
+    from settings import ASSET_DIR
+    monkeypatch.setattr(sprite_loader, 'asset_bundle', None)
+    manifest = [(f"{ASSET_DIR}/Sprites/Tiles/Default/key_yellow.png", 0.5),
+                (f"{ASSET_DIR}/Sprites/Tiles/Default/rock.png", 1.0)]
+    global_keys = list(sprite_loader.sprite_cache.surfaces)
+    cache = SpriteCache(budget_bytes=1 << 30)
+    cache.preload(manifest)
+    assert set(cache.surfaces) == {(path, scale, 'alpha') for path, scale in manifest}
+    assert list(sprite_loader.sprite_cache.surfaces) == global_keys